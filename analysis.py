@@ -0,0 +1,196 @@
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+import hashlib
+import os
+import threading
+import time
+from cache import ResultCache, get_api_version
+from polling import count_page_range, count_pages, polling_method
+from telemetry import get_telemetry
+from throttle import DEFAULT_MAX_TPS, RequestScheduler
+
+# Default number of analyze requests allowed in flight at once
+DEFAULT_MAX_CONCURRENCY = 4
+
+
+def get_max_concurrency():
+    """Read the in-flight request limit from the `max_concurrency` env var."""
+    return max(1, int(os.getenv("max_concurrency", DEFAULT_MAX_CONCURRENCY)))
+
+
+def get_max_tps():
+    """Read the analyze submissions-per-second budget from the `max_tps` env var."""
+    return max(0.1, float(os.getenv("max_tps", DEFAULT_MAX_TPS)))
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+# Function to get the request scheduler shared by every analysis in this process
+def get_scheduler():
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            scheduler = _scheduler = RequestScheduler(get_max_concurrency(), get_max_tps())
+            get_telemetry().add_collector(lambda: {
+                name: value for name, value in scheduler.stats().items()
+                if name in ("queue_depth", "in_flight", "concurrency_limit")
+            })
+        return _scheduler
+
+
+def _service_seconds(operation):
+    """Server-side processing time from the final poll response, if reported."""
+    try:
+        created = datetime.fromisoformat(operation["createdDateTime"])
+        updated = datetime.fromisoformat(operation["lastUpdatedDateTime"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    return max(0.0, (updated - created).total_seconds())
+
+
+# Function to analyze a single PDF and wait for the result
+def analyze_document(client, model_id, file_bytes, timing=None, pages=None, polling_settings=None):
+    """Analyze one PDF, optionally recording where the time went in `timing`.
+
+    `pages` limits the analysis to some pages, e.g. "2,4-5"; page numbers in
+    the result stay those of the whole PDF.
+
+    `timing` is filled with `upload` (sending the PDF until the service accepts
+    it), `service` (processing time reported by the service) and `polling`
+    (time spent waiting on the poller beyond the service time) and `polls`
+    (status requests sent). The same stages are recorded as telemetry spans,
+    with the bytes uploaded and pages returned. Polls follow the model's
+    `PollingStrategy`, built with `polling_settings` (a profile's `POLLING`),
+    which learns from each reported service time.
+    """
+    operation = {}
+    page_count = count_pages(file_bytes) if pages is None else count_page_range(pages)
+    polling = polling_method(client, model_id, page_count, polling_settings)
+
+    # Keep the final operation status so service time can be read from it
+    def capture_operation(pipeline_response, deserialized, headers):
+        operation.update(pipeline_response.http_response.json())
+        return deserialized
+
+    start = time.perf_counter()
+    poller = client.begin_analyze_document(
+        model_id=model_id, body=file_bytes, content_type="application/pdf", cls=capture_operation,
+        **({"polling": polling} if polling is not None else {}), **({"pages": pages} if pages is not None else {}),
+    )
+    accepted = time.perf_counter()
+    result = poller.result()
+    finished = time.perf_counter()
+
+    waited = finished - accepted
+    reported = _service_seconds(operation)
+    service = waited if reported is None else min(reported, waited)
+    polls = polling.polls if polling is not None else None
+    if polling is not None and reported is not None:
+        polling.strategy.observe(reported, page_count)
+    if timing is not None:
+        timing.update(upload=accepted - start, service=service, polling=waited - service, cached=False, polls=polls)
+
+    telemetry = get_telemetry()
+    telemetry.record("upload", accepted - start, model=model_id)
+    telemetry.record("service", service, model=model_id)
+    telemetry.record("polling", waited - service, model=model_id)
+    telemetry.count("bytes_uploaded", len(file_bytes), model=model_id)
+    telemetry.count("pages_processed", len(getattr(result, "pages", None) or []), model=model_id)
+    if polls is not None:
+        telemetry.count("polls", polls, model=model_id)
+    return result
+
+
+# Function to analyze a PDF, storing the result in the cache on success
+def analyze_and_cache(client, model_id, file_bytes, cache, key, timing=None, scheduler=None, polling_settings=None):
+    if scheduler is None:
+        result = analyze_document(client, model_id, file_bytes, timing, polling_settings=polling_settings)
+    else:
+        result = scheduler.call(analyze_document, client, model_id, file_bytes, timing, polling_settings=polling_settings)
+    if cache is not None:
+        cache.put(key, result)
+    return result
+
+
+# Function to analyze many PDFs concurrently
+def analyze_batch(client, model_id, files, max_concurrency=None, on_complete=None, return_exceptions=False, cache=None, timings=None, scheduler=None, keep_results=True, polling_settings=None):
+    """Analyze a batch of PDFs with a bounded number of requests in flight.
+
+    `files` is a list of PDF bytes. Results are returned in the same order as
+    `files`. `on_complete(index, result, completed)` is called from the calling
+    thread as each file finishes, so it can safely update Streamlit elements. When
+    `return_exceptions` is True a failed file yields its exception instead of
+    aborting the whole batch. If a `ResultCache` is given it is checked before
+    any request is sent, and cache hits complete without a network call.
+    `timings`, if given, is a list of one dict per file that is filled with the
+    timing breakdown from `analyze_document`. Requests go through `scheduler`
+    (the process-wide `RequestScheduler` by default), which keeps them under
+    the TPS budget and backs off and retries when Azure throttles. With
+    `keep_results` False each result is dropped once `on_complete` has seen
+    it, so only files still in flight are held in memory; the returned list
+    then holds None for every file that succeeded. A PDF appearing more than
+    once is sent once; its copies complete with the same result, and their
+    timings are zero and marked `duplicate`. `polling_settings` is the
+    profile's `POLLING` dict, passed on to `analyze_document`.
+    """
+    max_concurrency = max_concurrency or get_max_concurrency()
+    scheduler = scheduler or get_scheduler()
+    api_version = get_api_version(client)
+    results = [None] * len(files)
+    completed = 0
+
+    # Identical PDFs in the batch are analyzed once and share the first copy's result
+    duplicates = defaultdict(list)
+    first_copy = {}
+    for i, file_bytes in enumerate(files):
+        digest = hashlib.sha256(file_bytes).digest()
+        if digest in first_copy:
+            duplicates[first_copy[digest]].append(i)
+        else:
+            first_copy[digest] = i
+
+    def finish(i, result):
+        nonlocal completed
+        for j in [i] + duplicates[i]:
+            if j != i and timings is not None:
+                timings[j].update(upload=0.0, service=0.0, polling=0.0, cached=timings[i].get("cached", False), duplicate=True)
+            results[j] = result
+            completed += 1
+            if on_complete:
+                on_complete(j, result, completed)
+            if not (keep_results or isinstance(result, Exception)):
+                results[j] = None
+
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        futures = {}
+        for i in first_copy.values():
+            file_bytes = files[i]
+            key = cached = None
+            if cache is not None:
+                key = ResultCache.make_key(file_bytes, model_id, api_version)
+                cached = cache.get(key)
+            if cached is not None:
+                if timings is not None:
+                    timings[i].update(upload=0.0, service=0.0, polling=0.0, cached=True)
+                finish(i, cached)
+                continue
+
+            timing = timings[i] if timings is not None else None
+            futures[executor.submit(analyze_and_cache, client, model_id, file_bytes, cache, key, timing, scheduler, polling_settings)] = i
+
+        for future in as_completed(futures):
+            i = futures.pop(future)  # Finished futures would otherwise keep their results alive
+            try:
+                result = future.result()
+            except Exception as e:
+                if not return_exceptions:
+                    for pending in futures:
+                        pending.cancel()
+                    raise
+                result = e
+            finish(i, result)
+
+    return results
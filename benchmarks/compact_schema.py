@@ -0,0 +1,62 @@
+"""Measure the compact table schema against the string-column frames it replaced.
+
+"object" is the frame as pandas 2 built it (object columns); "str" is the
+same frame with pandas 3's default string dtype.
+
+Run from the repository root:
+
+    python benchmarks/compact_schema.py --rows 1000 10000 100000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from field_to_frame import make_table_field, per_row_frame
+from fields import compact_frame, field_to_frame
+from metrics_kernel import parse_amounts
+
+# Columns every metric re-parses
+AMOUNT_COLUMNS = ["Deposits/Credits", "Withdrawals/Debits", "Ending daily balance"]
+
+
+def megabytes(df):
+    return df.memory_usage(deep=True).sum() / 1e6
+
+
+def parse_time(df, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for col in AMOUNT_COLUMNS:
+            parse_amounts(df[col])
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'object (MB)':>12} {'str (MB)':>9} {'compact (MB)':>13} {'saved':>11} {'convert (ms)':>13} {'re-parse (ms)':>14} {'read (ms)':>10}")
+    for rows in args.rows:
+        field = make_table_field(rows)
+        legacy = per_row_frame(field)
+        start = time.perf_counter()
+        compact = compact_frame(field_to_frame(field))
+        convert = time.perf_counter() - start
+
+        for col in AMOUNT_COLUMNS:
+            assert ((parse_amounts(legacy[col]) == parse_amounts(compact[col])) | (legacy[col] == "N/A")).all(), col
+
+        old, text, new = megabytes(legacy.astype(object)), megabytes(legacy), megabytes(compact)
+        print(
+            f"{rows:>8} {old:>12.2f} {text:>9.2f} {new:>13.2f} {1 - new / old:>4.0%}/{1 - new / text:>4.0%}  {convert * 1000:>13.1f} "
+            f"{parse_time(legacy, args.repeat) * 1000:>14.1f} {parse_time(compact, args.repeat) * 1000:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Compare fields.field_to_frame against the per-row dict loop it replaced.
+
+Run from the repository root:
+
+    python benchmarks/field_to_frame.py --rows 5000 --repeat 5
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from azure.ai.documentintelligence.models import AnalyzeResult
+import pandas as pd
+
+from fields import field_to_frame
+
+
+# The loop every entry point used before field_to_frame
+def per_row_frame(value):
+    item_list = []
+    for item in value.value_array:
+        data = item.value_object
+        extracted_entry = {field: data.get(field, {}).get("valueString", "N/A") for field in data.keys()}
+        item_list.append(extracted_entry)
+    return pd.DataFrame(item_list)
+
+
+def make_table_field(rows):
+    def cell(value):
+        return {"type": "string", "valueString": value, "content": value, "confidence": 0.95}
+
+    value_array = []
+    for i in range(rows):
+        value_array.append({"type": "object", "valueObject": {
+            "Date": cell(f"{1 + i % 12:02d}/{1 + i % 28:02d}"),
+            "Description": cell(f"POS PURCHASE {i % 50}"),
+            "Deposits/Credits": cell(f"{(i * 37) % 5000:,}.00") if i % 3 == 0 else cell("N/A"),
+            "Withdrawals/Debits": cell(f"{(i * 13) % 900}.50"),
+            "Ending daily balance": cell(f"{(i * 101) % 20000 - 2000:,}.25"),
+        }})
+    result = AnalyzeResult({"documents": [{"docType": "bench", "fields": {
+        "TranscationHistory_page1": {"type": "array", "valueArray": value_array},
+    }}]})
+    return result.documents[0].fields["TranscationHistory_page1"]
+
+
+def best_of(fn, field, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(field)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'per-row (ms)':>14} {'columnar (ms)':>14} {'speedup':>8}")
+    for rows in args.rows:
+        field = make_table_field(rows)
+        assert per_row_frame(field).equals(field_to_frame(field))
+        old = best_of(per_row_frame, field, args.repeat)
+        new = best_of(field_to_frame, field, args.repeat)
+        print(f"{rows:>8} {old * 1000:>14.2f} {new * 1000:>14.2f} {old / new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Compare the batched metrics kernel against per-statement Python loops.
+
+Run from the repository root:
+
+    python benchmarks/metrics_kernel.py --statements 10000 50000 --days 31
+    python benchmarks/metrics_kernel.py --statements 10000 --profiles
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from metrics_kernel import batch_metrics, compute_metrics, statement_metrics
+from profiles import wells_fargo
+
+
+def make_statements(count, days, seed=0):
+    rng = np.random.default_rng(seed)
+    balances = [rng.normal(1500, 2000, days).round(2) for _ in range(count)]
+    deposits = [np.where(rng.random(days) < 0.2, rng.uniform(50, 5000, days).round(2), np.nan) for _ in range(count)]
+    return balances, deposits
+
+
+# The scalar loops the profiles used before the kernel
+def per_statement_loops(balances, deposits):
+    results = []
+    for statement_balances, statement_deposits in zip(balances, deposits):
+        values = statement_balances.tolist()
+        negative_days = sum(1 for balance in values if balance < 0)
+        amounts = [amount for amount in statement_deposits.tolist() if amount > 0]
+        results.append((sum(values) / len(values), negative_days, negative_days / len(values), len(amounts), sum(amounts)))
+    return results
+
+
+def kernel_per_statement(balances, deposits):
+    return [statement_metrics(b, d) for b, d in zip(balances, deposits)]
+
+
+def kernel_batch(balances, deposits):
+    return compute_metrics(
+        np.concatenate(balances), [len(b) for b in balances],
+        np.concatenate(deposits), [len(d) for d in deposits],
+    )
+
+
+def make_wells_fargo_data(balances, deposits):
+    statements = []
+    for statement_balances, statement_deposits in zip(balances, deposits):
+        table = pd.DataFrame({
+            "Deposits/Credits": [f"{amount:,.2f}" if amount == amount else "N/A" for amount in statement_deposits],
+            "Ending daily balance": statement_balances,
+        })
+        statements.append({"TranscationHistory_page1": table})
+    return statements
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--statements", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--days", type=int, default=31, help="daily balances per statement")
+    parser.add_argument("--profiles", action="store_true", help="also time wells_fargo.metrics against batch_metrics on DataFrames")
+    args = parser.parse_args()
+
+    print(f"{'statements':>10} {'loops (ms)':>11} {'kernel/stmt (ms)':>17} {'kernel batch (ms)':>18} {'speedup':>8}")
+    for count in args.statements:
+        balances, deposits = make_statements(count, args.days)
+
+        expected, loops = timed(per_statement_loops, balances, deposits)
+        singles, per_statement = timed(kernel_per_statement, balances, deposits)
+        batch, batched = timed(kernel_batch, balances, deposits)
+
+        for name, column in zip(["average_daily_balance", "negative_days", "negative_day_ratio", "deposit_count", "deposit_total"], zip(*expected)):
+            assert np.allclose(batch[name], column), name
+            assert np.array_equal([values[name] for values in singles], batch[name], equal_nan=True), name
+
+        print(f"{count:>10} {loops * 1000:>11.1f} {per_statement * 1000:>17.1f} {batched * 1000:>18.1f} {loops / batched:>7.1f}x")
+
+        if args.profiles:
+            statements = make_wells_fargo_data(balances, deposits)
+            one_by_one, single = timed(lambda: [wells_fargo.metrics(data) for data in statements])
+            together, batched = timed(batch_metrics, wells_fargo, statements)
+            assert one_by_one == together
+            print(f"{'':>10} wells_fargo.metrics {single * 1000:.1f} ms, batch_metrics {batched * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+"""Local stand-in for Azure Document Intelligence's analyze/poll protocol.
+
+Analyze requests are answered from the `AnalyzeResult` fixtures in
+benchmarks/fixtures, one per custom model. They have the shape of the
+service's responses (fields, confidences, bounding regions, spans) with
+synthetic account data, so every pipeline can be timed without an Azure
+endpoint or credentials. The service:
+
+- accepts `POST .../documentModels/{model}:analyze` with 202 and an
+  Operation-Location, or with 429 and Retry-After for a configurable
+  share of requests;
+- answers polls with "running" until the document's latency has passed
+  (a base delay plus a delay per page counted in the uploaded PDF), then
+  with "succeeded" and the fixture, its pages list sized to the PDF;
+- reads the text of the requested pages for the prebuilt read model;
+- for the prebuilt layout model, returns the requested pages with one word
+  per field value of the custom model last run on the same PDF, read with
+  high confidence, as a review pass would.
+
+Run it on its own and point the `endpoint` env var at it:
+
+    python benchmarks/mock_service.py --port 5050 --latency 0.5 --page-latency 0.1 --throttle-rate 0.05
+"""
+import argparse
+import copy
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import itertools
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# Custom model IDs served, named after their fixture files
+MODEL_IDS = ["chase", "wells_fargo", "bank_of_america"]
+READ_MODEL_ID = "prebuilt-read"
+LAYOUT_MODEL_ID = "prebuilt-layout"
+
+# Confidence of every word the layout model reads
+LAYOUT_CONFIDENCE = 0.99
+
+ANALYZE_PATH = re.compile(r"/documentModels/([^/:]+):analyze$")
+RESULT_PATH = re.compile(r"/documentModels/([^/:]+)/analyzeResults/([^/]+)$")
+PAGE_OBJECT = re.compile(rb"/Type\s*/Page(?![a-zA-Z])")
+TEXT_OPERATOR = re.compile(rb"\(((?:[^()\\]|\\.)*)\)\s*Tj")
+
+
+def load_fixture(model_id):
+    """The recorded analyzeResult for `model_id`, as the JSON the service returns."""
+    with open(os.path.join(FIXTURE_DIR, f"{model_id}.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def page_count(pdf_bytes):
+    return max(1, len(PAGE_OBJECT.findall(pdf_bytes)))
+
+
+def page_texts(pdf_bytes):
+    """Text drawn with Tj on each page, for PDFs whose page content streams are uncompressed."""
+    return [
+        " ".join(text.decode("latin-1") for text in TEXT_OPERATOR.findall(chunk))
+        for chunk in PAGE_OBJECT.split(pdf_bytes)[1:]
+    ]
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients closing idle keep-alive connections are expected, not errors
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+def _field_words(field):
+    """A word for every located value in a fixture field, as {page number: [words]}."""
+    if field.get("type") == "array":
+        children = field.get("valueArray") or []
+    elif field.get("type") == "object":
+        children = (field.get("valueObject") or {}).values()
+    else:
+        regions = field.get("boundingRegions") or []
+        if not (regions and field.get("content")):
+            return {}
+        word = {"content": field["content"], "polygon": regions[0]["polygon"], "confidence": LAYOUT_CONFIDENCE, "span": (field.get("spans") or [{}])[0]}
+        return {regions[0]["pageNumber"]: [word]}
+
+    words = {}
+    for child in children:
+        for page, page_words in _field_words(child).items():
+            words.setdefault(page, []).extend(page_words)
+    return words
+
+
+def layout_result(fixture, pages, wanted):
+    """Layout model result for a PDF of `pages` pages, with the fixture's values as words."""
+    words = {}
+    for document in fixture.get("documents") or []:
+        for field in (document.get("fields") or {}).values():
+            for page, page_words in _field_words(field).items():
+                words.setdefault(page, []).extend(page_words)
+
+    template = fixture["pages"][0] if fixture.get("pages") else {}
+    numbers = [number for number in range(1, pages + 1) if not wanted or number in wanted]
+    return {
+        "apiVersion": fixture.get("apiVersion"), "modelId": LAYOUT_MODEL_ID, "content": "",
+        "pages": [dict(template, pageNumber=number, words=words.get(number, [])) for number in numbers],
+    }
+
+
+def _wanted_pages(value):
+    """Page numbers named by an analyze `pages` parameter such as "1,3-5"."""
+    wanted = set()
+    for part in filter(None, value.split(",")):
+        first, _, last = part.partition("-")
+        wanted.update(range(int(first), int(last or first) + 1))
+    return wanted
+
+
+def _timestamp(seconds):
+    return datetime.fromtimestamp(seconds, timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+class MockDocumentIntelligence:
+    """A threaded HTTP server implementing the analyze long-running operation.
+
+    `latency` and `page_latency` set how long each document takes to finish;
+    A `poll_interval` is returned as retry-after-ms so clients poll at that
+    pace; 0 sends no header, as the SDK then uses its one second default.
+    `throttle_rate` is the fraction of analyze submissions rejected with 429
+    and a Retry-After of `retry_after` seconds. `stats` counts what was
+    served.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.2, page_latency=0.05, poll_interval=0.0, throttle_rate=0.0, retry_after=1, seed=0):
+        self.latency = latency
+        self.page_latency = page_latency
+        self.poll_interval = poll_interval
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.fixtures = {model_id: load_fixture(model_id) for model_id in MODEL_IDS}
+        self.stats = {"analyze": 0, "throttled": 0, "polls": 0, "pages": 0, "bytes": 0}
+
+        self._random = random.Random(seed)
+        self._ids = itertools.count(1)
+        self._operations = {}
+        self._models = {}  # Custom model last run on each PDF, for the layout model
+        self._lock = threading.Lock()
+        self.server = _Server((host, port), self._handler())
+        self._thread = None
+
+    @property
+    def endpoint(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def poll_headers(self):
+        return [("retry-after-ms", str(int(self.poll_interval * 1000)))] if self.poll_interval else []
+
+    # Function to accept or throttle one analyze submission
+    def submit(self, model_id, query, body):
+        with self._lock:
+            if self._random.random() < self.throttle_rate:
+                self.stats["throttled"] += 1
+                return None
+
+            self.stats["analyze"] += 1
+            self.stats["bytes"] += len(body)
+            pages = page_count(body)
+            wanted = _wanted_pages(query.get("pages", [""])[0])
+            self.stats["pages"] += len(wanted & set(range(1, pages + 1))) if wanted else pages
+            operation_id = f"{next(self._ids):08d}"
+
+        if model_id == READ_MODEL_ID:
+            texts = page_texts(body)
+            if wanted:
+                texts = [text for number, text in enumerate(texts, 1) if number in wanted]
+            result = {"apiVersion": "2024-11-30", "modelId": model_id, "content": "\n".join(texts), "pages": []}
+        elif model_id == LAYOUT_MODEL_ID:
+            fixture = self.fixtures.get(self._models.get(hash(body)), {"pages": []})
+            result = layout_result(fixture, pages, wanted)
+        else:
+            self._models[hash(body)] = model_id
+            result = copy.deepcopy(self.fixtures[model_id])
+            template = result["pages"][0] if result["pages"] else {}
+            result["pages"] = [dict(template, pageNumber=number) for number in range(1, pages + 1)]
+
+        created = time.time()
+        with self._lock:
+            self._operations[operation_id] = (created, created + self.latency + self.page_latency * pages, result)
+        return operation_id
+
+    # Function to report an operation's status, finishing it once its latency has passed
+    def poll(self, operation_id):
+        with self._lock:
+            self.stats["polls"] += 1
+            operation = self._operations.get(operation_id)
+        if operation is None:
+            return None
+
+        created, ready, result = operation
+        status = {"status": "running", "createdDateTime": _timestamp(created), "lastUpdatedDateTime": _timestamp(min(time.time(), ready))}
+        if time.time() >= ready:
+            with self._lock:
+                self._operations.pop(operation_id, None)
+            status.update(status="succeeded", analyzeResult=result)
+        return status
+
+    def _handler(self):
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep connections alive, as Azure does
+
+            def log_message(self, *args):
+                pass
+
+            def send_json(self, status, body, headers=()):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in headers:
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def not_found(self, message):
+                self.send_json(404, {"error": {"code": "NotFound", "message": message}})
+
+            def do_POST(self):
+                url = urlsplit(self.path)
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                match = ANALYZE_PATH.search(url.path)
+                if not match or match.group(1) not in service.fixtures and match.group(1) not in (READ_MODEL_ID, LAYOUT_MODEL_ID):
+                    return self.not_found(f"Model not found: {url.path}")
+
+                model_id = match.group(1)
+                query = parse_qs(url.query)
+                operation_id = service.submit(model_id, query, body)
+                if operation_id is None:
+                    return self.send_json(
+                        429, {"error": {"code": "429", "message": "Requests to the analyze operation have exceeded the rate limit."}},
+                        [("Retry-After", str(service.retry_after))],
+                    )
+
+                api_version = query.get("api-version", [""])[0]
+                location = f"{service.endpoint}{url.path.rsplit(':', 1)[0]}/analyzeResults/{operation_id}?api-version={api_version}"
+                self.send_response(202)
+                self.send_header("Operation-Location", location)
+                for name, value in service.poll_headers():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def do_GET(self):
+                match = RESULT_PATH.search(urlsplit(self.path).path)
+                status = service.poll(match.group(2)) if match else None
+                if status is None:
+                    return self.not_found(f"Operation not found: {self.path}")
+                self.send_json(200, status, service.poll_headers())
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5050)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds every document takes")
+    parser.add_argument("--page-latency", type=float, default=0.05, help="extra seconds per PDF page")
+    parser.add_argument("--poll-interval", type=float, default=0.0, help="seconds clients are told to wait between polls, 0 for none")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="fraction of analyze requests answered with 429")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with each 429")
+    args = parser.parse_args()
+
+    service = MockDocumentIntelligence(
+        args.host, args.port, args.latency, args.page_latency, args.poll_interval, args.throttle_rate, args.retry_after,
+    )
+    print(f"Serving {', '.join(MODEL_IDS + [READ_MODEL_ID, LAYOUT_MODEL_ID])} at {service.endpoint} (Ctrl+C to stop)")
+    try:
+        service.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.server.server_close()
+        print(json.dumps(service.stats))
+
+
+if __name__ == "__main__":
+    main()
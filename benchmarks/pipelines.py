@@ -0,0 +1,258 @@
+"""Time the analysis pipelines end to end against the local mock service.
+
+Each entry point runs in its own process, against generated PDFs and the
+mock Document Intelligence service from mock_service.py, so no Azure
+endpoint or credentials are needed:
+
+- dashboard: what the Streamlit pages run per upload batch
+  (analyze_batch_split, then the profile's extract and metrics per file);
+- cli: cli.py's process_files, streaming summary rows to a JSONL writer.
+  Bank "auto" also routes the files first.
+
+For every entry point, bank, statement length (--pages; the default 1 page
+case covers short statements) and poll schedule (--polling: the adaptive
+`polling.PollingStrategy` and the SDK's own) it reports files/sec, the
+p50/p95 time from the start of the run until each file's summary is ready,
+and the peak resident memory of the process. Run from the repository root:
+
+    python benchmarks/pipelines.py --files 40 --pages 3 --latency 0.3
+    python benchmarks/pipelines.py --entry-points cli --banks auto --throttle-rate 0.1 --json results.json
+"""
+import argparse
+import contextlib
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from mock_service import MockDocumentIntelligence
+from profiles import PROFILES, analysis_settings, get_profile
+
+ENTRY_POINTS = ["dashboard", "cli"]
+
+# Fixture (and mock model ID) per bank profile
+BANK_MODELS = {"chase": "chase", "wellsfargo": "wells_fargo", "bofa": "bank_of_america"}
+
+
+def make_pdf(page_texts):
+    """A minimal PDF with one line of text per page."""
+    count = len(page_texts)
+    font = 3 + 2 * count
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{' '.join(f'{3 + 2 * i} 0 R' for i in range(count))}] /Count {count} >>",
+    ]
+    for i, text in enumerate(page_texts):
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {4 + 2 * i} 0 R"
+            f" /Resources << /Font << /F1 {font} 0 R >> >> >>"
+        )
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+    objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    pdf, offsets = b"%PDF-1.4\n", []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(pdf))
+        pdf += f"{number} 0 obj\n{body}\nendobj\n".encode()
+    xref = len(pdf)
+    pdf += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    pdf += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    pdf += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return pdf
+
+
+# Function to write `count` statements of `pages` pages for each bank
+def write_statements(directory, banks, count, pages):
+    paths = {}
+    for bank in banks:
+        os.makedirs(os.path.join(directory, f"{pages}p", bank), exist_ok=True)
+        marker = PROFILES[bank]["markers"][0]
+        paths[bank] = []
+        for i in range(count):
+            path = os.path.join(directory, f"{pages}p", bank, f"statement-{i:04d}.pdf")
+            with open(path, "wb") as f:
+                f.write(make_pdf([f"{marker} statement {i} page 1"] + [f"Page {page}" for page in range(2, pages + 1)]))
+            paths[bank].append(path)
+    return paths
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+
+
+def percentile(values, q):
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+
+# Function to run one entry point in this process and measure it
+def run_entry_point(entry_point, bank, paths, pages_per_chunk):
+    from analysis import get_max_concurrency, get_scheduler
+    from client import connection_stats, get_client
+
+    client = get_client()
+    max_concurrency = get_max_concurrency()
+    baseline_mb = peak_rss_mb()
+    finished = []
+    failed = 0
+    start = time.perf_counter()
+
+    if entry_point == "dashboard":
+        from splitting import analyze_batch_split
+
+        profile = get_profile(bank)
+        files = []
+        for path in paths:
+            with open(path, "rb") as f:
+                files.append(f.read())
+
+        def on_complete(i, result, completed):
+            nonlocal failed
+            extracted_data = None if isinstance(result, Exception) else profile.extract(result)
+            if extracted_data is None:
+                failed += 1
+            else:
+                profile.metrics(extracted_data)
+            finished.append(time.perf_counter() - start)
+
+        analyze_batch_split(
+            client, os.getenv(profile.MODEL_ID_ENV), files, pages_per_chunk=pages_per_chunk, max_concurrency=max_concurrency,
+            on_complete=on_complete, return_exceptions=True, keep_results=False, **analysis_settings(profile),
+        )
+    else:
+        import cli
+        from export import ROW_COLUMNS, open_writer
+
+        class TimedWriter:
+            def __init__(self, writer):
+                self.writer = writer
+
+            def write(self, row, tables=None):
+                self.writer.write(row, tables)
+                finished.append(time.perf_counter() - start)
+
+        with contextlib.redirect_stderr(open(os.devnull, "w")):
+            groups = cli.route_paths(paths, client, max_concurrency) if bank == "auto" else {bank: paths}
+            for group, group_paths in groups.items():
+                profile = get_profile(group)
+                writer = open_writer("jsonl", os.devnull, list(ROW_COLUMNS) + profile.SUMMARY_COLUMNS)
+                try:
+                    failed += cli.process_files(
+                        group_paths, profile, group, client, os.getenv(profile.MODEL_ID_ENV), TimedWriter(writer),
+                        max_concurrency, pages_per_chunk=pages_per_chunk,
+                    )
+                finally:
+                    writer.close()
+
+    elapsed = time.perf_counter() - start
+    scheduler_stats = get_scheduler().stats()
+    return {
+        "entry_point": entry_point,
+        "bank": bank,
+        "files": len(paths),
+        "failed": failed,
+        "seconds": elapsed,
+        "files_per_sec": len(paths) / elapsed,
+        "p50": percentile(finished, 50),
+        "p95": percentile(finished, 95),
+        "peak_mb": peak_rss_mb(),
+        "baseline_mb": baseline_mb,
+        "throttled": scheduler_stats["throttled"],
+        "retries": scheduler_stats["retries"],
+        "requests": connection_stats()["requests"],
+    }
+
+
+# Function to run one entry point in a fresh process, so its peak memory is its own
+def measure(entry_point, bank, paths, service, args, polling="adaptive"):
+    env = dict(
+        os.environ, endpoint=service.endpoint, key="benchmark", polling=polling,
+        max_concurrency=str(args.concurrency), max_tps=str(args.max_tps),
+        **{get_profile(name).MODEL_ID_ENV: model_id for name, model_id in BANK_MODELS.items()},
+    )
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+        json.dump(paths, f)
+    try:
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--run", entry_point, bank, f.name, "--pages-per-chunk", str(args.pages_per_chunk)],
+            env=env, cwd=ROOT, check=True, capture_output=True, text=True,
+        ).stdout
+    finally:
+        os.remove(f.name)
+    return json.loads(output.splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entry-points", nargs="+", choices=ENTRY_POINTS, default=ENTRY_POINTS)
+    parser.add_argument("--banks", nargs="+", choices=list(BANK_MODELS) + ["auto"], default=list(BANK_MODELS))
+    parser.add_argument("--files", type=int, default=20, help="statements per bank")
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 3], help="pages per statement, one case per count")
+    parser.add_argument("--pages-per-chunk", type=int, default=0, help="split statements into page ranges of this size")
+    parser.add_argument("--polling", nargs="+", choices=["adaptive", "sdk"], default=["adaptive", "sdk"], help="poll schedules to compare")
+    parser.add_argument("--concurrency", type=int, default=4, help="max_concurrency for the pipelines")
+    parser.add_argument("--max-tps", type=float, default=15, help="max_tps for the pipelines")
+    parser.add_argument("--latency", type=float, default=0.2, help="mock seconds per document")
+    parser.add_argument("--page-latency", type=float, default=0.05, help="mock seconds per page")
+    parser.add_argument("--poll-interval", type=float, default=0.0, help="mock retry-after between polls, 0 for none")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="fraction of analyze requests the mock answers with 429")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with each 429")
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--run", nargs=3, metavar=("ENTRY_POINT", "BANK", "PATHS_JSON"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        entry_point, bank, paths_file = args.run
+        with open(paths_file) as f:
+            paths = json.load(f)
+        print(json.dumps(run_entry_point(entry_point, bank, paths, args.pages_per_chunk)))
+        return
+
+    if "auto" in args.banks and "dashboard" in args.entry_points:
+        print("Bank auto only applies to the cli entry point; skipping it for dashboard", file=sys.stderr)
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory, MockDocumentIntelligence(
+        latency=args.latency, page_latency=args.page_latency, poll_interval=args.poll_interval,
+        throttle_rate=args.throttle_rate, retry_after=args.retry_after,
+    ) as service:
+        paths = {}
+        for pages in args.pages:
+            paths[pages] = write_statements(directory, [bank for bank in args.banks if bank != "auto"] or list(BANK_MODELS), args.files, pages)
+            paths[pages]["auto"] = [path for bank_paths in paths[pages].values() for path in bank_paths]
+
+        print(
+            f"{'entry point':<11} {'bank':<10} {'pages':>5} {'polling':<8} {'files':>5} {'failed':>6} {'files/s':>8}"
+            f" {'p50 (s)':>8} {'p95 (s)':>8} {'peak MB':>8} {'429s':>5} {'requests':>8}"
+        )
+        for entry_point in args.entry_points:
+            for bank in args.banks:
+                if bank == "auto" and entry_point != "cli":
+                    continue
+                for pages in args.pages:
+                    for polling in args.polling:
+                        result = measure(entry_point, bank, paths[pages][bank], service, args, polling)
+                        result.update(pages=pages, polling=polling)
+                        results.append(result)
+                        print(
+                            f"{entry_point:<11} {bank:<10} {pages:>5} {polling:<8} {result['files']:>5} {result['failed']:>6} {result['files_per_sec']:>8.2f}"
+                            f" {result['p50']:>8.2f} {result['p95']:>8.2f} {result['peak_mb']:>8.1f} {result['throttled']:>5} {result['requests']:>8}"
+                        )
+        print(f"Mock service: {json.dumps(service.stats)}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Check the Streamlit entry points' cold start against a time budget.
+
+Each entry point is loaded in a fresh Python process, as after a container
+restart, and its empty upload page is run once with Streamlit's AppTest,
+then rerun. For each it reports:
+
+- the first run, from loading the script to the page being drawn, which
+  covers importing the app's modules (Streamlit itself is already loaded,
+  as it is in the server before any script runs);
+- a rerun of the same page, with the modules already loaded;
+- the import-time profile of that first run, from `python -X importtime`:
+  total import time and the slowest top-level imports;
+- any heavy module (pandas, the Azure SDK, ...) loaded before a file was
+  submitted.
+
+It exits with status 1 when a first run exceeds the budget or loads a heavy
+module. Run from the repository root:
+
+    python benchmarks/startup.py
+    python benchmarks/startup.py --budget-ms 150 --json startup.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENTRY_POINTS = ["app.py", "chase.py", "WellsFargo.py", "BankOfAmerica.py"]
+
+# Milliseconds allowed for the first run of an empty upload page
+DEFAULT_BUDGET_MS = 200
+
+# Modules that should only load once a file is submitted
+HEAVY_MODULES = ["pandas", "numpy", "pyarrow", "pypdf", "azure.core", "azure.ai.documentintelligence", "openpyxl"]
+
+# Written to stderr between Streamlit's imports and the entry point's
+MARKER = "--- entry point ---"
+
+
+def run_entry_point(entry_point):
+    """Load `entry_point` in this process and time its first run and a rerun."""
+    from streamlit.testing.v1 import AppTest
+
+    sys.path.insert(0, ROOT)
+    print(MARKER, file=sys.stderr, flush=True)
+    start = time.perf_counter()
+    app = AppTest.from_file(os.path.join(ROOT, entry_point), default_timeout=60).run()
+    first_run = time.perf_counter() - start
+    print(MARKER, file=sys.stderr, flush=True)
+
+    start = time.perf_counter()
+    app.run()
+    rerun = time.perf_counter() - start
+    return {
+        "first_run_ms": first_run * 1000,
+        "rerun_ms": rerun * 1000,
+        "errors": [str(exception.value) for exception in app.exception],
+        "heavy_modules": [name for name in HEAVY_MODULES if name in sys.modules],
+    }
+
+
+def import_profile(stderr, top=5):
+    """Total import milliseconds and the slowest top-level imports between the markers."""
+    sections = stderr.split(MARKER)
+    lines = sections[1].splitlines() if len(sections) > 2 else []
+    total, imports = 0, []
+    for line in lines:
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        total += int(self_us)
+        if not name[1:].startswith(" "):  # Nested imports are indented under their importer
+            imports.append((int(cumulative_us), name.strip()))
+    return total / 1000, [f"{name} {us / 1000:.0f}ms" for us, name in sorted(imports, reverse=True)[:top]]
+
+
+def measure(entry_point):
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", os.path.abspath(__file__), "--run", entry_point],
+        capture_output=True, text=True, cwd=ROOT, check=True,
+    )
+    result = json.loads(process.stdout.strip().splitlines()[-1])
+    result["entry_point"] = entry_point
+    result["import_ms"], result["slowest_imports"] = import_profile(process.stderr)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entry-points", nargs="+", choices=ENTRY_POINTS, default=ENTRY_POINTS)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="most milliseconds a first run may take")
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--run", metavar="ENTRY_POINT", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        print(json.dumps(run_entry_point(args.run)))
+        return 0
+
+    results = []
+    over_budget = False
+    print(f"{'entry point':<18} {'first run':>10} {'rerun':>8} {'imports':>8}  slowest imports")
+    for entry_point in args.entry_points:
+        result = measure(entry_point)
+        result["budget_ms"] = args.budget_ms
+        result["within_budget"] = result["first_run_ms"] <= args.budget_ms and not result["heavy_modules"] and not result["errors"]
+        over_budget |= not result["within_budget"]
+        results.append(result)
+
+        print(
+            f"{entry_point:<18} {result['first_run_ms']:>8.0f}ms {result['rerun_ms']:>6.0f}ms {result['import_ms']:>6.0f}ms"
+            f"  {', '.join(result['slowest_imports']) or '-'}"
+        )
+        if result["heavy_modules"]:
+            print(f"  loaded before any upload: {', '.join(result['heavy_modules'])}", file=sys.stderr)
+        for error in result["errors"]:
+            print(f"  error: {error}", file=sys.stderr)
+
+    print(f"Budget {args.budget_ms:.0f}ms per first run: {'exceeded' if over_budget else 'met'}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
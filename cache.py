@@ -0,0 +1,132 @@
+from azure.ai.documentintelligence.models import AnalyzeResult
+import hashlib
+import json
+import os
+import threading
+import time
+from telemetry import get_telemetry
+
+# Defaults, overridable with the cache_dir / cache_max_mb / cache_ttl_hours env vars
+DEFAULT_CACHE_DIR = ".cache/analyze_results"
+DEFAULT_MAX_MB = 512
+DEFAULT_TTL_HOURS = 24 * 7
+
+
+def get_api_version(client):
+    """Return the API version a DocumentIntelligenceClient is configured for."""
+    return getattr(getattr(client, "_config", None), "api_version", "") or ""
+
+
+class ResultCache:
+    """On-disk cache of raw AnalyzeResult payloads.
+
+    Entries are keyed by the SHA-256 of the PDF bytes plus the model ID and API
+    version, so an unchanged statement analyzed with the same model never goes
+    back to Azure. The directory is kept under `max_bytes` by evicting the
+    least recently used entries, and entries older than `ttl` seconds are
+    treated as misses.
+    """
+
+    def __init__(self, directory=None, max_bytes=None, ttl=None):
+        self.directory = directory or os.getenv("cache_dir", DEFAULT_CACHE_DIR)
+        self.max_bytes = max_bytes or int(float(os.getenv("cache_max_mb", DEFAULT_MAX_MB)) * 1024 * 1024)
+        self.ttl = ttl or float(os.getenv("cache_ttl_hours", DEFAULT_TTL_HOURS)) * 3600
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def make_key(file_bytes, model_id, api_version=""):
+        digest = hashlib.sha256(file_bytes).hexdigest()
+        return hashlib.sha256(f"{digest}:{model_id}:{api_version}".encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _count(self, hit):
+        get_telemetry().count("cache_hits" if hit else "cache_misses")
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key):
+        """Return the cached AnalyzeResult for `key`, or None on a miss."""
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self._count(False)
+            return None
+
+        if time.time() - entry.get("stored_at", 0) > self.ttl:
+            self._remove(path)
+            self._count(False)
+            return None
+
+        # Touch the file so eviction sees it as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        self._count(True)
+        return AnalyzeResult(entry["result"])
+
+    def put(self, key, result):
+        """Store an AnalyzeResult and evict old entries if over the size limit."""
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"stored_at": time.time(), "result": result.as_dict()}, f)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def evict(self):
+        entries = []
+        total = 0
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+            total += stat.st_size
+
+        # Drop least recently used entries first
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(os.path.join(self.directory, name))
+            total -= size
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            self._remove(os.path.join(self.directory, name))
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+_result_cache = None
+
+
+# Function to get the process-wide cache, so counters survive Streamlit reruns
+def get_result_cache():
+    global _result_cache
+    if _result_cache is None:
+        _result_cache = ResultCache()
+    return _result_cache
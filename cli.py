@@ -0,0 +1,322 @@
+"""Process bank statements in bulk without Streamlit.
+
+Examples:
+
+    python cli.py statements/ --bank chase --output chase.jsonl
+    python cli.py "archive/2024/**/*.pdf" --bank wellsfargo --format parquet --output wf.parquet
+    python cli.py mixed/ --bank auto --output mixed.csv
+    python cli.py long.pdf --bank chase --pages-per-chunk 4 --verify-split
+    python cli.py statements/ --bank bofa --review --output bofa.csv
+    python cli.py statements/ --bank chase --tables --output chase.xlsx
+
+Summary rows, and with --tables each statement's tables, are written as
+each statement finishes. Statements are read and analyzed a chunk at a
+time, so memory stays bounded however many files match.
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import glob
+import hashlib
+import os
+import sys
+from dotenv import load_dotenv
+import pandas as pd
+from analysis import get_max_concurrency, get_scheduler
+from cache import get_result_cache
+from client import connection_stats, get_client
+from export import ROW_COLUMNS, open_writer
+from metrics_kernel import batch_metrics
+from preflight import describe
+from profiles import PROFILES, analysis_settings, get_profile
+from review import review_document
+from routing import get_route_cache, route_batch
+from splitting import analyze_batch_split, compare_split, get_pages_per_chunk
+from store import get_statement_store
+from telemetry import get_telemetry
+
+# Statements read into memory per chunk, as a multiple of the concurrency limit
+CHUNK_FACTOR = 4
+
+
+# Function to expand directories and glob patterns into PDF paths
+def find_pdfs(inputs):
+    paths = []
+    for pattern in inputs:
+        if os.path.isdir(pattern):
+            pattern = os.path.join(pattern, "**", "*.pdf")
+        paths.extend(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+    return sorted(dict.fromkeys(paths))
+
+
+# Function to group paths by detected bank, reading one chunk of files at a time
+def route_paths(paths, client, max_concurrency):
+    groups = {}
+    route_cache = get_route_cache()
+    for chunk in chunked(paths, max_concurrency * CHUNK_FACTOR):
+        files = []
+        for path in chunk:
+            with open(path, "rb") as f:
+                files.append(f.read())
+
+        banks = route_batch(files, client=client, route_cache=route_cache, max_concurrency=max_concurrency)
+        for path, bank in zip(chunk, banks):
+            if bank is None:
+                print(f"{path}: bank not detected, using the generic profile", file=sys.stderr)
+            groups.setdefault(bank or "generic", []).append(path)
+    return groups
+
+
+def chunked(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def error_message(e):
+    return str(e) or type(e).__name__
+
+
+# Function to pull a statement's fields and tables out of one analysis result
+def extract_statement(profile, result):
+    """The profile's extracted data for `result`, or the exception explaining why there is none."""
+    try:
+        if isinstance(result, Exception):
+            raise result
+        extracted_data = profile.extract(result)
+        if extracted_data is None:
+            raise ValueError("No data extracted")
+        return extracted_data
+    except Exception as e:
+        return e
+
+
+# Function to turn a chunk of extracted statements into summary rows, saving them to `store` if given
+def summarize(profile, bank, paths, statements, files=None, store=None, tables=None):
+    """Return one summary row per entry of `statements`, lined up with `paths`.
+
+    `statements` holds each file's extracted data, or the exception that
+    stopped it. The chunk's metrics come from one `batch_metrics` pass; if
+    that fails, each statement is summarized alone so only the bad one gets
+    the error. `tables`, if given, holds one dict per statement to fill with
+    its DataFrames.
+    """
+    rows = [{"File Name": path, "Bank": bank, "Error": None} for path in paths]
+    extracted = [i for i, statement in enumerate(statements) if not isinstance(statement, Exception)]
+    try:
+        with get_telemetry().span("metrics", profile=bank):
+            summaries = batch_metrics(profile, [statements[i] for i in extracted])
+    except Exception:
+        summaries = []
+        for i in extracted:
+            try:
+                summaries.append(profile.metrics(statements[i]))
+            except Exception as e:
+                summaries.append(e)
+
+    for i, statement in enumerate(statements):
+        if isinstance(statement, Exception):
+            rows[i]["Error"] = error_message(statement)
+    for i, summary in zip(extracted, summaries):
+        try:
+            if isinstance(summary, Exception):
+                raise summary
+            rows[i].update(summary)
+            if tables is not None:
+                tables[i].update((name, value) for name, value in statements[i].items() if isinstance(value, pd.DataFrame))
+            if store is not None:
+                store.add(bank, profile, paths[i], hashlib.sha256(files[i]).hexdigest(), statements[i], summary)
+        except Exception as e:
+            rows[i]["Error"] = error_message(e)
+    return rows
+
+
+# Function to review a batch's low-confidence fields, leaving the corrected results in `cache`
+def review_files(paths, files, profile, client, model_id, max_concurrency, cache, pages_per_chunk=0, drop_pages=None):
+    def review(file_bytes):
+        try:
+            return review_document(
+                client, model_id, file_bytes, cache=cache, pages_per_chunk=pages_per_chunk, drop_pages=drop_pages, **analysis_settings(profile),
+            )[1]
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        for path, fields in zip(paths, executor.map(review, files)):
+            if isinstance(fields, Exception):
+                print(f"{path}: review failed: {fields}", file=sys.stderr)
+            elif fields:
+                corrected = sum(field["Corrected"] for field in fields)
+                print(f"{path}: review corrected {corrected} of {len(fields)} low-confidence field(s)", file=sys.stderr)
+
+
+# Function to analyze every statement and stream one row per file to `writer`
+def process_files(paths, profile, bank, client, model_id, writer, max_concurrency, cache=None, pages_per_chunk=0, store=None, drop_pages=None, report=None, review=False, tables=False):
+    """Analyze `paths` in batches, writing a row per file; returns the number that failed.
+
+    A chunk's rows are written once all its files have finished, so its
+    metrics are computed in one kernel pass; each result is reduced to its
+    extracted data as it arrives. `report`, if given, accumulates the
+    batches' pre-flight totals. With
+    `review`, each batch's low-confidence fields are reviewed first, so the
+    rows are built from the corrected results in `cache`. With `tables`, each
+    statement's tables are passed to `writer` along with its row.
+    """
+    failed = 0
+    done = 0
+
+    for chunk in chunked(paths, max_concurrency * CHUNK_FACTOR):
+        files = []
+        for path in chunk:
+            with open(path, "rb") as f:
+                files.append(f.read())
+
+        statements = [None] * len(chunk)
+
+        def on_complete(i, result, completed):
+            statements[i] = extract_statement(profile, result)
+
+        if review:
+            review_files(chunk, files, profile, client, model_id, max_concurrency, cache, pages_per_chunk, drop_pages)
+
+        batch_report = {}
+        analyze_batch_split(
+            client, model_id, files, pages_per_chunk=pages_per_chunk, max_concurrency=max_concurrency,
+            on_complete=on_complete, return_exceptions=True, cache=cache, keep_results=False,
+            drop_pages=drop_pages, report=batch_report, **analysis_settings(profile),
+        )
+        if report is not None:
+            for name, value in batch_report.items():
+                report[name] = report.get(name, 0) + value
+
+        statement_tables = [{} for _ in chunk] if tables else None
+        for i, row in enumerate(summarize(profile, bank, chunk, statements, files, store, statement_tables)):
+            writer.write(row, statement_tables[i] if tables else None)
+            done += 1
+            if row["Error"]:
+                failed += 1
+                print(f"[{done}/{len(paths)}] {chunk[i]}: {row['Error']}", file=sys.stderr)
+            else:
+                print(f"[{done}/{len(paths)}] {chunk[i]}", file=sys.stderr)
+
+    return failed
+
+
+# Function to report where split and single-request analysis disagree
+def verify_split(paths, profile, client, model_id, pages_per_chunk):
+    mismatched = 0
+    for path in paths:
+        with open(path, "rb") as f:
+            differences = compare_split(client, model_id, f.read(), profile, pages_per_chunk)
+        if differences:
+            mismatched += 1
+        for difference in differences:
+            print(f"{path}: split mismatch: {difference}", file=sys.stderr)
+    return mismatched
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Extract bank statement metrics without Streamlit.")
+    parser.add_argument("inputs", nargs="+", help="PDF files, directories or glob patterns")
+    parser.add_argument("--bank", required=True, choices=["auto"] + list(PROFILES), help="bank profile to apply, or auto to detect it per file")
+    parser.add_argument("--format", choices=["jsonl", "csv", "parquet", "xlsx"], help="output format (default: from --output extension, else jsonl)")
+    parser.add_argument("--tables", action="store_true", help="also export every statement's tables: as sheets for xlsx, as a ZIP archive of files for csv and parquet")
+    parser.add_argument("--output", "-o", default="-", help="output file, '-' for stdout (default)")
+    parser.add_argument("--model-id", help="override the profile's model_id env var (not with --bank auto)")
+    parser.add_argument("--concurrency", type=int, help="most analyze requests in flight; lowered automatically while Azure throttles (default: max_concurrency env var)")
+    parser.add_argument("--max-tps", type=float, help="analyze submissions per second (default: max_tps env var)")
+    parser.add_argument("--no-cache", action="store_true", help="skip the on-disk result cache")
+    parser.add_argument("--no-store", action="store_true", help="do not append statements to the local statement store (store_path env var)")
+    parser.add_argument("--pages-per-chunk", type=int, help="analyze long statements as page ranges of this size in parallel, 0 to disable (default: pages_per_chunk env var)")
+    parser.add_argument("--drop-pages", action="store_true", default=None, help="remove pages headed by the profile's IRRELEVANT_PAGES, such as check images, before upload (default: drop_pages env var)")
+    parser.add_argument("--review", action="store_true", help="re-analyze only the pages of low-confidence fields and use the corrected values (review_model_id / review_confidence env vars)")
+    parser.add_argument("--metrics-port", type=int, help="serve Prometheus metrics on this port while running (default: metrics_port env var)")
+    parser.add_argument("--trace-log", help="append one JSON line per pipeline stage span to this file (default: trace_log env var)")
+    parser.add_argument("--verify-split", action="store_true", help="also analyze each statement in one request and report any difference from the split result")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    if args.bank == "auto" and args.model_id:
+        parser.error("--model-id cannot be combined with --bank auto")
+    if args.review and args.no_cache:
+        parser.error("--review keeps its corrections in the result cache and cannot be combined with --no-cache")
+
+    fmt = args.format
+    if fmt is None:
+        extension = os.path.splitext(args.output)[1].lstrip(".").lower()
+        fmt = extension if extension in ("csv", "parquet", "xlsx") else "jsonl"
+    if args.tables and fmt == "jsonl":
+        parser.error("--tables needs --format csv, parquet or xlsx")
+
+    paths = find_pdfs(args.inputs)
+    if not paths:
+        parser.error("no PDF files matched")
+
+    if not (os.getenv("endpoint") and os.getenv("key")):
+        parser.error("set the endpoint and key env vars (or .env) for Azure Document Intelligence")
+
+    telemetry = get_telemetry()
+    if args.trace_log:
+        telemetry.set_trace_log(args.trace_log)
+    if args.metrics_port:
+        telemetry.serve(args.metrics_port)
+
+    max_concurrency = args.concurrency or get_max_concurrency()
+    get_scheduler().configure(max_concurrency=max_concurrency, max_tps=args.max_tps)
+    client = get_client()  # Its connection pool is sized from the scheduler's limit
+    pages_per_chunk = get_pages_per_chunk() if args.pages_per_chunk is None else args.pages_per_chunk
+    if args.verify_split and not pages_per_chunk:
+        parser.error("--verify-split needs --pages-per-chunk (or the pages_per_chunk env var)")
+    groups = route_paths(paths, client, max_concurrency) if args.bank == "auto" else {args.bank: paths}
+
+    columns = list(ROW_COLUMNS)
+    model_ids = {}
+    for bank in groups:
+        profile = get_profile(bank)
+        columns.extend(col for col in profile.SUMMARY_COLUMNS if col not in columns)
+        model_ids[bank] = args.model_id or os.getenv(profile.MODEL_ID_ENV)
+        if not model_ids[bank]:
+            parser.error(f"no model ID: pass --model-id or set {profile.MODEL_ID_ENV}")
+
+    try:
+        writer = open_writer(fmt, args.output, columns, tables=args.tables)
+    except (ImportError, ValueError) as e:
+        parser.error(str(e))
+    failed = 0
+    preflight_report = {}
+    try:
+        for bank, bank_paths in groups.items():
+            failed += process_files(
+                bank_paths, get_profile(bank), bank, client, model_ids[bank], writer,
+                max_concurrency, cache=None if args.no_cache else get_result_cache(), pages_per_chunk=pages_per_chunk,
+                store=None if args.no_store else get_statement_store(), drop_pages=args.drop_pages, report=preflight_report,
+                review=args.review, tables=args.tables,
+            )
+            if args.verify_split:
+                failed += verify_split(bank_paths, get_profile(bank), client, model_ids[bank], pages_per_chunk)
+    finally:
+        writer.close()
+
+    scheduler_stats = get_scheduler().stats()
+    print(f"Processed {len(paths)} file(s), {failed} failed", file=sys.stderr)
+    print(
+        f"Throttled {scheduler_stats['throttled']} time(s), {scheduler_stats['retries']} retry(ies), "
+        f"concurrency limit {scheduler_stats['concurrency_limit']}/{scheduler_stats['max_concurrency']}",
+        file=sys.stderr,
+    )
+    if preflight_report:
+        print(f"Pre-flight: {describe(preflight_report)}", file=sys.stderr)
+    pool_stats = connection_stats()
+    print(f"HTTP: {pool_stats['requests']} request(s) over {pool_stats['connections']} connection(s)", file=sys.stderr)
+    snapshot = telemetry.snapshot()
+    stages = ", ".join(f"{stage} {span['seconds']:.2f}s/{span['count']}" for stage, span in snapshot["spans"].items())
+    print(f"Stages (total time/spans): {stages or 'none'}", file=sys.stderr)
+    counters = snapshot["counters"]
+    print(
+        f"Pages: {counters.get('pages_processed', 0)}, uploaded: {counters.get('bytes_uploaded', 0):,} bytes, "
+        f"cache hits: {counters.get('cache_hits', 0)}/{counters.get('cache_hits', 0) + counters.get('cache_misses', 0)}",
+        file=sys.stderr,
+    )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+from azure.core.credentials import AzureKeyCredential
+from azure.core.pipeline.transport import RequestsTransport
+from azure.ai.documentintelligence import DocumentIntelligenceClient
+import os
+import socket
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.util.retry import Retry
+from analysis import get_scheduler
+from telemetry import get_telemetry
+
+# Seconds to establish a connection, and to wait between bytes of a response
+DEFAULT_CONNECTION_TIMEOUT = 10
+DEFAULT_READ_TIMEOUT = 60
+
+# Extra pooled connections beyond the concurrency limit, for bank detection reads
+POOL_HEADROOM = 2
+
+_client = None
+_adapter = None
+_client_lock = threading.Lock()
+
+
+class KeepAliveAdapter(HTTPAdapter):
+    """HTTPAdapter whose pooled sockets send TCP keep-alives while idle between polls."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs["socket_options"] = HTTPConnection.default_socket_options + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+        super().init_poolmanager(*args, **kwargs)
+
+
+# Function to build the pooled HTTP transport behind the client
+def build_transport(pool_size):
+    """A requests transport keeping up to `pool_size` connections per host alive.
+
+    Retries stay disabled at the urllib3 level; the SDK's retry policy and the
+    request scheduler own them. Timeouts come from the `connection_timeout`
+    and `read_timeout` env vars.
+    """
+    adapter = KeepAliveAdapter(
+        pool_connections=4, pool_maxsize=pool_size,
+        max_retries=Retry(total=False, redirect=False, raise_on_status=False),
+    )
+    session = requests.Session()
+    for prefix in ("http://", "https://"):
+        session.mount(prefix, adapter)
+
+    transport = RequestsTransport(
+        session=session, session_owner=False,
+        connection_timeout=float(os.getenv("connection_timeout", DEFAULT_CONNECTION_TIMEOUT)),
+        read_timeout=float(os.getenv("read_timeout", DEFAULT_READ_TIMEOUT)),
+    )
+    return transport, adapter
+
+
+# Function to get the Document Intelligence client shared by every bank profile
+def get_client():
+    """Return the process-wide client, creating it from the `endpoint` and `key` env vars.
+
+    Streamlit imports this module once per server process, so the client and
+    its connection pool (sized to the scheduler's concurrency limit) outlive
+    reruns and keep TLS sessions warm between batches. Every response passes
+    the scheduler's throttle observer, so 429s the SDK retries on its own
+    still shrink the concurrency limit.
+    """
+    global _client, _adapter
+    with _client_lock:
+        if _client is None:
+            transport, _adapter = build_transport(get_scheduler().max_concurrency + POOL_HEADROOM)
+            _client = DocumentIntelligenceClient(
+                endpoint=os.getenv("endpoint"), credential=AzureKeyCredential(os.getenv("key")),
+                transport=transport, per_retry_policies=[get_scheduler().policy],
+            )
+            get_telemetry().add_collector(lambda: {
+                f"http_{name}": value for name, value in connection_stats().items() if name != "requests"
+            })
+        return _client
+
+
+def connection_stats():
+    """Requests sent and connections opened by the shared client's pool so far."""
+    with _client_lock:
+        pools = [] if _adapter is None else [_adapter.poolmanager.pools.get(key) for key in _adapter.poolmanager.pools.keys()]
+    pools = [pool for pool in pools if pool is not None]
+    requests_sent = sum(pool.num_requests for pool in pools)
+    connections = sum(pool.num_connections for pool in pools)
+    return {"requests": requests_sent, "connections": connections, "reused": max(0, requests_sent - connections)}
@@ -0,0 +1,427 @@
+"""The upload page shared by every Streamlit entry point.
+
+Only Streamlit, the profile registry and telemetry are imported up front,
+so the empty upload page appears without loading pandas, the Azure SDK or
+the client. Each function imports the pipeline modules it needs when it is
+first called, once files have been submitted; Streamlit keeps them loaded
+across reruns. `python benchmarks/startup.py` checks this against a
+start-up time budget.
+"""
+import streamlit as st
+import hashlib
+import os
+import tempfile
+import time
+from functools import partial
+from dotenv import load_dotenv
+from profiles import PROFILES, analysis_settings, get_profile, get_view, profile_label
+from telemetry import get_telemetry
+
+load_dotenv()
+
+# Selector value that routes each file to its detected bank
+AUTO = "auto"
+
+# Session state entry holding finished statements, keyed by `file_key`
+STATEMENTS_KEY = "statements"
+
+# Session state entry mapping each set of uploads to the background job it was queued as
+JOBS_KEY = "jobs"
+
+# Seconds between status checks of a background job
+JOB_REFRESH_SECONDS = 2
+
+# Session state entry holding the last review's flagged fields, per bank profile
+REVIEW_KEY = "review"
+
+EXPORT_LABELS = {"xlsx": "Excel workbook", "csv": "CSV files (ZIP)", "parquet": "Parquet files (ZIP)"}
+
+
+def file_key(bank, uploaded_file):
+    """Identity of an upload under a profile; the same name and bytes give the same statement."""
+    return bank, uploaded_file.name, hashlib.sha256(uploaded_file.getvalue()).hexdigest()
+
+
+# Function to re-extract a statement's tables, normally straight from the result cache
+def load_statement_data(bank, uploaded_file):
+    from cache import get_result_cache
+    from client import get_client
+    from splitting import analyze_batch_split
+
+    profile = get_profile(bank)
+    result = analyze_batch_split(
+        get_client(), os.getenv(profile.MODEL_ID_ENV), [uploaded_file.getvalue()], cache=get_result_cache(),
+        **analysis_settings(profile),
+    )[0]
+    return profile.extract(result)
+
+
+def new_statement(bank, uploaded_file, key, extracted_data, summary):
+    """A statement as kept in session state; "data" is dropped once it has been drawn."""
+    import pandas as pd
+
+    return {
+        "id": "|".join(key),
+        "name": uploaded_file.name,
+        "summary": summary,
+        "fields": {name: value for name, value in extracted_data.items() if not isinstance(value, pd.DataFrame)},
+        "data": extracted_data,
+        "load": partial(load_statement_data, bank, uploaded_file),
+    }
+
+
+# Function to append a statement to the local store for cross-statement queries
+def save_statement(bank, profile, uploaded_file, key, extracted_data, summary):
+    from store import get_statement_store
+
+    try:
+        get_statement_store().add(bank, profile, uploaded_file.name, key[2], extracted_data, summary)
+    except Exception as e:
+        st.warning(f"Could not save {uploaded_file.name} to the statement store: {e}")
+
+
+# Function to show figures across every stored statement, per account
+def show_history():
+    from store import get_statement_store
+
+    with st.expander("📚 Statement History (all stored statements)"):
+        accounts = get_statement_store().accounts()
+        if accounts.empty:
+            st.write("No statements stored yet.")
+        else:
+            st.dataframe(accounts, use_container_width=True)
+
+
+# Function to analyze uploaded PDFs with a bank profile
+def process_uploaded_files(bank, uploaded_files, keys, slots, shared):
+    """Analyze every upload and draw each statement into its slot as soon as it finishes.
+
+    Returns one statement dict per file, lined up with `uploaded_files`; a file
+    that failed or yielded no data gets None after its error or warning is
+    shown. Each statement's tables are released right after it is drawn, so
+    memory does not grow with the batch.
+    """
+    from analysis import get_scheduler
+    from cache import get_result_cache
+    from client import connection_stats, get_client
+    from preflight import describe
+    from progress import ProgressReporter
+    from splitting import analyze_batch_split
+
+    profile = get_profile(bank)
+    view = get_view(bank)
+    statements = [None] * len(uploaded_files)
+    preflight_report = {}
+
+    with st.spinner("Processing documents..."):
+        # Progress moves as each file finishes, in whatever order Azure returns them
+        reporter = ProgressReporter([uploaded_file.name for uploaded_file in uploaded_files], scheduler=get_scheduler())
+
+        def on_complete(i, result, completed):
+            reporter.on_complete(i, result, completed)
+            start = time.perf_counter()
+            uploaded_file = uploaded_files[i]
+
+            with slots[i]:
+                try:
+                    if isinstance(result, Exception):
+                        raise result
+
+                    extracted_data = profile.extract(result)
+
+                    if extracted_data is not None:
+                        summary = profile.metrics(extracted_data)
+                        save_statement(bank, profile, uploaded_file, keys[i], extracted_data, summary)
+                        statement = new_statement(bank, uploaded_file, keys[i], extracted_data, summary)
+                        view.render_statement(statement, shared)
+                        del statement["data"]
+                        statements[i] = statement
+                    else:
+                        st.warning(f"No data extracted from {uploaded_file.name}")
+
+                except Exception as e:
+                    st.error(f"Error processing {uploaded_file.name}: {e}")
+
+            reporter.record(i, "post_processing", time.perf_counter() - start)
+
+        # Long statements are fanned out as page ranges when pages_per_chunk is set
+        analyze_batch_split(
+            get_client(), os.getenv(profile.MODEL_ID_ENV),
+            [uploaded_file.getvalue() for uploaded_file in uploaded_files],
+            on_complete=on_complete, return_exceptions=True, cache=get_result_cache(),
+            timings=reporter.timings, keep_results=False, report=preflight_report, **analysis_settings(profile),
+        )
+
+        reporter.finish()
+
+    st.caption(f"Pre-flight: {describe(preflight_report)}")
+    cache_stats = get_result_cache().stats()
+    st.caption(f"Result cache: {cache_stats['hits']} hit(s), {cache_stats['misses']} miss(es)")
+    scheduler_stats = get_scheduler().stats()
+    st.caption(
+        f"Azure throttling: {scheduler_stats['throttled']} throttled response(s), {scheduler_stats['retries']} retry(ies), "
+        f"concurrency limit {scheduler_stats['concurrency_limit']}/{scheduler_stats['max_concurrency']}"
+    )
+    pool_stats = connection_stats()
+    st.caption(
+        f"Connections: {pool_stats['requests']} request(s) over {pool_stats['connections']} connection(s), "
+        f"{pool_stats['reused']} reused"
+    )
+    reporter.show_timings()
+
+    return statements
+
+
+# Function to draw a profile's uploads, analyzing only those not yet in session state
+def show_statements(bank, uploaded_files):
+    """Draw each upload's statement in upload order and return the files' keys.
+
+    Statements already in session state are drawn straight away; new or
+    changed files are analyzed and drawn into their place as they finish.
+    Files that failed are not stored and are tried again on the next rerun.
+    A file uploaded more than once is drawn only at its first upload, as its
+    widgets are keyed by the statement.
+    """
+    processed = st.session_state.setdefault(STATEMENTS_KEY, {})
+    view = get_view(bank)
+    shared = {}
+
+    keys = [file_key(bank, uploaded_file) for uploaded_file in uploaded_files]
+    slots = [st.container() for _ in uploaded_files]
+
+    pending = []
+    for i, key in enumerate(keys):
+        if key in keys[:i]:
+            with slots[i]:
+                st.caption(f"{uploaded_files[i].name} was uploaded more than once; it is shown above.")
+        elif key in processed:
+            with slots[i]:
+                view.render_statement(processed[key], shared)
+        else:
+            pending.append(i)
+
+    if pending:
+        new_statements = process_uploaded_files(
+            bank, [uploaded_files[i] for i in pending], [keys[i] for i in pending], [slots[i] for i in pending], shared,
+        )
+        for i, statement in zip(pending, new_statements):
+            if statement is not None:
+                processed[keys[i]] = statement
+
+    return keys
+
+
+# Function to re-analyze the pages of a profile's low-confidence fields on request
+def review_statements(bank, uploaded_files, keys):
+    """Offer a review of the uploads' low-confidence fields and show the last one.
+
+    Corrected results replace their cache entries, and the corrected
+    statements are dropped from session state so the rerun redraws them.
+    """
+    import pandas as pd
+    from cache import get_result_cache
+    from client import get_client
+    from review import get_review_confidence, review_document
+
+    reviews = st.session_state.setdefault(REVIEW_KEY, {})
+    if st.button(
+        "🔍 Review low-confidence fields", key=f"review-{bank}",
+        help=f"Re-analyze only the pages holding fields at or below {get_review_confidence():.0%} confidence.",
+    ):
+        profile = get_profile(bank)
+        processed = st.session_state.setdefault(STATEMENTS_KEY, {})
+        flagged = []
+        with st.spinner("Re-analyzing low-confidence pages..."):
+            for i, (uploaded_file, key) in enumerate(zip(uploaded_files, keys)):
+                if key in keys[:i]:
+                    continue
+                try:
+                    _, fields = review_document(
+                        get_client(), os.getenv(profile.MODEL_ID_ENV), uploaded_file.getvalue(), cache=get_result_cache(),
+                        **analysis_settings(profile),
+                    )
+                except Exception as e:
+                    st.error(f"Could not review {uploaded_file.name}: {e}")
+                    continue
+                flagged += [{"File Name": uploaded_file.name, **field} for field in fields]
+                if any(field["Corrected"] for field in fields):
+                    processed.pop(key, None)
+        reviews[bank] = flagged
+        st.rerun()
+
+    if bank in reviews:
+        flagged = reviews[bank]
+        corrected = sum(field["Corrected"] for field in flagged)
+        with st.expander(f"🔍 Review: {corrected} of {len(flagged)} low-confidence field(s) corrected"):
+            if flagged:
+                st.dataframe(pd.DataFrame(flagged), use_container_width=True)
+            else:
+                st.write("No low-confidence fields found.")
+
+
+# Function to write statements' summaries and tables to a temporary export file
+def export_statements(statements, fmt):
+    """Return the export of `(bank, statement)` pairs as an open binary file.
+
+    Each statement's tables are re-extracted (normally from the result cache)
+    and written before the next is loaded, so a large batch is never held in
+    memory at once.
+    """
+    import pandas as pd
+    from export import ROW_COLUMNS, open_writer
+
+    columns = list(ROW_COLUMNS)
+    for bank in dict.fromkeys(bank for bank, _ in statements):
+        columns.extend(col for col in get_profile(bank).SUMMARY_COLUMNS if col not in columns)
+
+    output = tempfile.TemporaryFile()
+    writer = open_writer(fmt, output, columns, tables=True)
+    try:
+        for bank, statement in statements:
+            row = {"File Name": statement["name"], "Bank": bank, "Error": None, **statement["summary"]}
+            try:
+                data = statement["load"]() or {}
+            except Exception as e:
+                row["Error"], data = str(e) or type(e).__name__, {}
+            writer.write(row, {name: value for name, value in data.items() if isinstance(value, pd.DataFrame)})
+    finally:
+        writer.close()
+    output.seek(0)
+    return output
+
+
+# Function to offer the finished statements as one download, built when it is clicked
+def show_export(keys):
+    from export import MIME_TYPES, export_formats
+
+    processed = st.session_state.get(STATEMENTS_KEY, {})
+    statements = [(key[0], processed[key]) for key in dict.fromkeys(keys) if key in processed]
+    if not statements:
+        return
+
+    st.markdown("### 📥 Export")
+    fmt = st.selectbox("Export format", export_formats(), format_func=EXPORT_LABELS.get, key="export-format")
+    st.download_button(
+        f"Download summaries and tables ({len(statements)} statement(s))",
+        partial(export_statements, statements, fmt), file_name=f"statements.{'xlsx' if fmt == 'xlsx' else 'zip'}",
+        mime=MIME_TYPES[fmt], on_click="ignore",
+    )
+
+
+# Function to queue uploads for the background workers, once per set of files
+def submit_job(bank, uploaded_files):
+    from jobs import get_job_queue
+
+    keys = tuple(file_key(bank, uploaded_file) for uploaded_file in uploaded_files)
+    jobs = st.session_state.setdefault(JOBS_KEY, {})
+    if keys not in jobs:
+        jobs[keys] = get_job_queue().submit(bank, [(uploaded_file.name, uploaded_file.getvalue()) for uploaded_file in uploaded_files])
+    return jobs[keys]
+
+
+# Function to show a background job's progress and summaries, refreshed while the page is open
+@st.fragment(run_every=JOB_REFRESH_SECONDS)
+def show_job(job_id):
+    import pandas as pd
+    from jobs import get_job_queue
+
+    queue = get_job_queue()
+    status = queue.status(job_id)
+    finished = status["done"] + status["failed"]
+    st.progress(finished / status["total"] if status["total"] else 1.0)
+    st.caption(
+        f"Job {job_id[:8]}: {status['done']} done, {status['failed']} failed, "
+        f"{status['running']} running, {status['queued']} queued"
+    )
+
+    results = queue.results(job_id)
+    if results:
+        st.dataframe(pd.DataFrame(results), use_container_width=True)
+    if status["finished"]:
+        st.success("✅ Extraction Completed!")
+    elif not status["running"]:
+        st.info("⏳ Waiting for a worker; start one with `python jobs.py worker`.")
+
+
+def use_job_queue():
+    """Whether uploads go to background workers by default (the `job_queue` env var)."""
+    return os.getenv("job_queue", "").lower() in ("1", "true", "yes", "on")
+
+
+# Function to group uploads by the bank detected on their first page
+def route_uploaded_files(uploaded_files):
+    """Return {bank: [uploaded files]}; undetected files use the generic profile."""
+    from client import get_client
+    from routing import get_route_cache, route_batch
+
+    with st.spinner("Detecting banks..."):
+        banks = route_batch(
+            [uploaded_file.getvalue() for uploaded_file in uploaded_files],
+            client=get_client(), route_cache=get_route_cache(),
+        )
+
+    groups = {}
+    unknown = []
+    for uploaded_file, bank in zip(uploaded_files, banks):
+        if bank is None:
+            unknown.append(uploaded_file.name)
+            bank = "generic"
+        groups.setdefault(bank, []).append(uploaded_file)
+
+    if unknown:
+        st.warning(f"Could not detect the bank for: {', '.join(unknown)}. Using the generic profile.")
+
+    return groups
+
+
+def selector_label(name):
+    return "Auto-detect" if name == AUTO else profile_label(name)
+
+
+# Function to render the upload page; `bank` pins a profile, otherwise the user picks one
+def run(bank=None):
+    st.set_page_config(page_title="Loot Intelligence", page_icon="📄", layout="wide")
+    st.title("📄 Loot Intelligence")
+    get_telemetry()  # Starts the metrics endpoint once per server process when metrics_port is set
+
+    if bank is None:
+        bank = st.selectbox("Bank", [AUTO] + list(PROFILES), format_func=selector_label)
+
+    # File upload section
+    st.markdown(f"### 📤 Upload Bank Statements ({selector_label(bank)})")
+    uploaded_files = st.file_uploader("Choose PDF files", type=["pdf"], accept_multiple_files=True)
+    background = st.toggle(
+        "Process in background workers", value=use_job_queue(),
+        help="Queue the files for `python jobs.py worker` processes instead of analyzing them in this session.",
+    )
+
+    if uploaded_files and background:
+        st.success(f"✅ {len(uploaded_files)} file(s) uploaded! Queued for the workers...")
+        show_job(submit_job(bank, uploaded_files))
+        show_history()
+    elif uploaded_files:
+        st.success(f"✅ {len(uploaded_files)} file(s) uploaded! Extracting data...")
+        groups = route_uploaded_files(uploaded_files) if bank == AUTO else {bank: uploaded_files}
+
+        # Files already analyzed this session are reused; only new or changed ones are sent
+        current = []
+        for group_bank, group_files in groups.items():
+            if bank == AUTO:
+                st.markdown(f"## 🏦 {profile_label(group_bank)} ({len(group_files)} file(s))")
+            keys = show_statements(group_bank, group_files)
+            review_statements(group_bank, group_files, keys)
+            current.extend(keys)
+
+        # Drop statements whose upload has been removed
+        processed = st.session_state[STATEMENTS_KEY]
+        kept = set(current)
+        for key in [key for key in processed if key not in kept]:
+            del processed[key]
+
+        st.success("✅ Extraction Completed!")
+        show_export(current)
+        show_history()
+    else:
+        st.session_state.pop(STATEMENTS_KEY, None)
+        st.session_state.pop(REVIEW_KEY, None)
+        st.info("📥 Please upload one or more PDF files for extraction.")
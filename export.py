@@ -0,0 +1,281 @@
+import csv
+import json
+import os
+import re
+import sys
+import tempfile
+import zipfile
+import pandas as pd
+from fields import clean_value, display_frame, to_number
+
+# Columns written ahead of each profile's summary columns
+ROW_COLUMNS = ["File Name", "Bank", "Error"]
+
+# Most rows Excel allows on one sheet, header included
+EXCEL_MAX_ROWS = 1048576
+
+FORMAT_NAMES = {"jsonl": "JSON lines", "csv": "CSV", "parquet": "Parquet", "xlsx": "Excel"}
+
+MIME_TYPES = {
+    "csv": "application/zip", "parquet": "application/zip",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+class JsonlWriter:
+    """Write one JSON object per line, flushing as each row arrives.
+
+    Like the other summary writers it ignores `tables`; `ZipExport` and
+    `ExcelWriter` export them.
+    """
+
+    def __init__(self, stream, columns):
+        self.stream = stream
+        self.columns = columns
+
+    def write(self, row, tables=None):
+        self.stream.write(json.dumps({col: clean_value(row.get(col)) for col in self.columns}, default=str) + "\n")
+        self.stream.flush()
+
+    def close(self):
+        if self.stream is not sys.stdout:
+            self.stream.close()
+
+
+class CsvWriter:
+    """Write CSV rows with a fixed header, flushing as each row arrives."""
+
+    def __init__(self, stream, columns):
+        self.stream = stream
+        self.writer = csv.DictWriter(stream, fieldnames=columns, extrasaction="ignore")
+        self.writer.writeheader()
+
+    def write(self, row, tables=None):
+        self.writer.writerow({col: clean_value(value) for col, value in row.items()})
+        self.stream.flush()
+
+    def close(self):
+        if self.stream is not sys.stdout:
+            self.stream.close()
+
+
+class ParquetWriter:
+    """Write rows to a Parquet file one row group at a time.
+
+    Only `row_group_size` rows are buffered in memory. Identity columns are
+    stored as strings and summary columns as float64, parsed with `to_number`.
+    Requires the optional `pyarrow` package.
+    """
+
+    def __init__(self, path, columns, row_group_size=1000):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Parquet output needs pyarrow: pip install pyarrow") from e
+
+        self.pa = pa
+        self.columns = columns
+        self.row_group_size = row_group_size
+        self.schema = pa.schema([
+            (col, pa.string() if col in ROW_COLUMNS else pa.float64()) for col in columns
+        ])
+        self.writer = pq.ParquetWriter(path, self.schema)
+        self.rows = []
+
+    def write(self, row, tables=None):
+        self.rows.append({
+            col: (None if row.get(col) is None else str(row[col])) if col in ROW_COLUMNS else to_number(row.get(col))
+            for col in self.columns
+        })
+        if len(self.rows) >= self.row_group_size:
+            self.flush()
+
+    def flush(self):
+        if self.rows:
+            self.writer.write_table(self.pa.Table.from_pylist(self.rows, schema=self.schema))
+            self.rows = []
+
+    def close(self):
+        self.flush()
+        self.writer.close()
+
+
+def table_frame(df, file_name):
+    """A statement's table ready for export: dollars, plain labels and its file name first."""
+    df = display_frame(df)
+    df = df.assign(**{col: df[col].astype(object) for col in df.columns if isinstance(df[col].dtype, pd.CategoricalDtype)})
+    return pd.concat([pd.Series(file_name, index=df.index, name="File Name"), df.reset_index(drop=True)], axis=1)
+
+
+def _part_key(name, df):
+    """Tables share an output part only when their name, columns and types all match."""
+    return name, tuple((col, str(dtype)) for col, dtype in df.dtypes.items())
+
+
+def _safe_name(name):
+    return re.sub(r"[^\w.-]+", "_", name).strip("_") or "table"
+
+
+class ZipExport:
+    """Write summaries and every statement's tables as CSV or Parquet files in one ZIP archive.
+
+    The archive holds summaries.<ext> plus tables/<table>.<ext> per table
+    name; statements whose table has other columns go to <table>_2 and so
+    on. Rows are appended to files in a temporary directory as each
+    statement arrives, so only one statement's tables are in memory at a
+    time, and the files are zipped on close. `output` is a path or a binary
+    file object. Parquet needs the optional `pyarrow` package.
+    """
+
+    def __init__(self, fmt, output, columns):
+        if fmt not in ("csv", "parquet"):
+            raise ValueError(f"Tables cannot be exported as '{fmt}'")
+        self.fmt = fmt
+        self.output = output
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.members = {}
+        self.parts = {}
+
+        summary_path = self._member_path("summaries")
+        if fmt == "parquet":
+            self.summaries = ParquetWriter(summary_path, columns)
+        else:
+            self.summaries = CsvWriter(open(summary_path, "w", newline="", encoding="utf-8"), columns)
+
+    def _member_path(self, name):
+        path = os.path.join(self.tempdir.name, f"{len(self.members)}.{self.fmt}")
+        self.members[path] = f"{name}.{self.fmt}"
+        return path
+
+    def _open_part(self, name, df):
+        parts = sum(1 for table_name, _ in self.parts if table_name == name)
+        path = self._member_path(f"tables/{_safe_name(name)}" + (f"_{parts + 1}" if parts else ""))
+        if self.fmt == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            schema = pa.Schema.from_pandas(df, preserve_index=False)
+            return pq.ParquetWriter(path, schema), schema
+        return open(path, "w", newline="", encoding="utf-8"), None
+
+    def write(self, row, tables=None):
+        self.summaries.write(row)
+        for name, df in (tables or {}).items():
+            df = table_frame(df, row.get("File Name"))
+            key = _part_key(name, df)
+            if key not in self.parts:
+                self.parts[key] = self._open_part(name, df)
+                if self.fmt == "csv":
+                    df.head(0).to_csv(self.parts[key][0], index=False)
+
+            part, schema = self.parts[key]
+            if self.fmt == "parquet":
+                import pyarrow as pa
+                part.write_table(pa.Table.from_pandas(df, schema=schema, preserve_index=False))
+            else:
+                df.to_csv(part, header=False, index=False, date_format="%Y-%m-%d")
+
+    def close(self):
+        try:
+            self.summaries.close()
+            for part, _ in self.parts.values():
+                part.close()
+            with zipfile.ZipFile(self.output, "w", zipfile.ZIP_DEFLATED) as archive:
+                for path, member in self.members.items():
+                    archive.write(path, member)
+        finally:
+            self.tempdir.cleanup()
+
+
+def _cell(value):
+    if value is None or value is pd.NA or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    return clean_value(value)
+
+
+class ExcelWriter:
+    """Write summaries and every statement's tables as sheets of one .xlsx workbook.
+
+    The Summary sheet gets a row per statement and each table name a sheet
+    of its own (with a "File Name" column), split like `ZipExport` parts
+    when columns differ or a sheet reaches Excel's row limit. openpyxl's
+    write-only mode streams the sheets to disk as rows arrive, so memory
+    stays bounded. Requires the optional `openpyxl` package.
+    """
+
+    def __init__(self, output, columns):
+        try:
+            from openpyxl import Workbook
+        except ImportError as e:
+            raise ImportError("Excel output needs openpyxl: pip install openpyxl") from e
+
+        self.output = output
+        self.columns = columns
+        self.workbook = Workbook(write_only=True)
+        self.summaries = self.workbook.create_sheet("Summary")
+        self.summaries.append(columns)
+        self.sheets = {}  # part key: [sheet, rows written]
+        self.titles = {"Summary"}
+
+    def _new_sheet(self, name, columns):
+        base = re.sub(r"[\[\]:*?/\\]", "_", name).strip("'")[:28] or "Table"
+        title = base[:31]
+        number = 1
+        while title in self.titles:
+            number += 1
+            title = f"{base} {number}"[:31]
+        self.titles.add(title)
+        sheet = self.workbook.create_sheet(title)
+        sheet.append(list(columns))
+        return [sheet, 1]
+
+    def write(self, row, tables=None):
+        self.summaries.append([_cell(row.get(col)) for col in self.columns])
+        for name, df in (tables or {}).items():
+            df = table_frame(df, row.get("File Name"))
+            key = _part_key(name, df)
+            for values in df.itertuples(index=False, name=None):
+                if key not in self.sheets or self.sheets[key][1] >= EXCEL_MAX_ROWS:
+                    self.sheets[key] = self._new_sheet(name, df.columns)
+                self.sheets[key][0].append([_cell(value) for value in values])
+                self.sheets[key][1] += 1
+
+    def close(self):
+        self.workbook.save(self.output)
+
+
+def export_formats():
+    """Formats `open_writer(..., tables=True)` can write here; Excel and Parquet need optional packages."""
+    import importlib.util
+    formats = ["csv"]
+    if importlib.util.find_spec("openpyxl"):
+        formats.insert(0, "xlsx")
+    if importlib.util.find_spec("pyarrow"):
+        formats.append("parquet")
+    return formats
+
+
+# Function to open a row writer for an output format
+def open_writer(fmt, output, columns, tables=False):
+    """Open a JSONL, CSV, Parquet or Excel row writer; `output` of None or "-" means stdout.
+
+    With `tables`, the tables passed to `write` are exported too: to an
+    Excel workbook, or to a ZIP archive of CSV or Parquet files.
+    """
+    if (fmt in ("parquet", "xlsx") or tables) and output in (None, "-"):
+        raise ValueError(f"{'Table' if tables else FORMAT_NAMES[fmt]} output needs a file path")
+    if fmt == "xlsx":
+        return ExcelWriter(output, columns)
+    if tables:
+        return ZipExport(fmt, output, columns)
+    if fmt == "parquet":
+        return ParquetWriter(output, columns)
+
+    stream = sys.stdout if output in (None, "-") else open(output, "w", newline="", encoding="utf-8")
+    if fmt == "csv":
+        return CsvWriter(stream, columns)
+    if fmt == "jsonl":
+        return JsonlWriter(stream, columns)
+    raise ValueError(f"Unknown output format '{fmt}'")
@@ -0,0 +1,176 @@
+import numpy as np
+import pandas as pd
+import re
+from telemetry import traced
+
+# Cell types whose typed value is used instead of valueString
+NUMBER_TYPES = {"number": "valueNumber", "integer": "valueInteger"}
+
+
+def _raw(value):
+    """Plain JSON dict behind an SDK model; models are mappings over `_data`."""
+    return getattr(value, "_data", value)
+
+
+def clean_value(value):
+    """Plain Python scalar for a summary value; numpy scalars are unwrapped and "N/A" becomes None."""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, str) and value == "N/A":
+        return None
+    return value
+
+
+def to_number(value):
+    """Parse a summary value such as 1234.5, "$1,234.50" or "12.5%" into a float."""
+    value = clean_value(value)
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(str(value).replace("$", "").replace(",", "").replace("%", "").strip())
+    except ValueError:
+        return None
+
+
+def _string_column(cells):
+    return [cell.get("valueString", "N/A") if cell is not None else None for cell in cells]
+
+
+def _number_column(cells, value_key):
+    values = [cell.get(value_key) if cell is not None else None for cell in cells]
+    return np.array([np.nan if value is None else value for value in values], dtype="float64")
+
+
+def _currency_column(cells):
+    currencies = [_raw(cell.get("valueCurrency")) if cell is not None else None for cell in cells]
+    return np.array([currency.get("amount", np.nan) if currency else np.nan for currency in currencies], dtype="float64")
+
+
+def _date_column(cells):
+    return pd.to_datetime([cell.get("valueDate") if cell is not None else None for cell in cells], errors="coerce")
+
+
+def _column_values(cells):
+    cell_types = {cell.get("type") for cell in cells if cell is not None}
+    cell_type = cell_types.pop() if len(cell_types) == 1 else None  # Mixed types fall back to strings
+
+    if cell_type in NUMBER_TYPES:
+        return _number_column(cells, NUMBER_TYPES[cell_type])
+    if cell_type == "currency":
+        return _currency_column(cells)
+    if cell_type == "date":
+        return _date_column(cells)
+    return _string_column(cells)
+
+
+# Function to convert an array field (a table) into a DataFrame
+@traced("field_to_frame")
+def field_to_frame(field):
+    """Convert an array-of-objects DocumentField into a DataFrame.
+
+    Cells are gathered column by column in a single pass over the rows rather
+    than building a dict per row. String cells keep their `valueString` ("N/A"
+    when absent); columns whose cells are all typed as number, integer,
+    currency or date become float64 or datetime64 columns. Columns appear in
+    the order they are first seen and a row missing a column gets a null.
+    """
+    rows = [_raw(row).get("valueObject") or {} for row in _raw(field).get("valueArray") or []]
+    names = dict.fromkeys(name for cells in rows for name in cells)
+
+    columns = {}
+    for name in names:
+        cells = [getattr(cell, "_data", cell) if (cell := cells.get(name)) is not None else None for cells in rows]
+        columns[name] = _column_values(cells)
+
+    return pd.DataFrame(columns)
+
+
+# Column names `compact_frame` treats as money, dates and repeated labels
+AMOUNT_COLUMN = re.compile(r"amount|balance|deposit|credit|withdrawal|debit", re.IGNORECASE)
+DATE_COLUMN = re.compile(r"date", re.IGNORECASE)
+CATEGORY_COLUMN = re.compile(r"description|type", re.IGNORECASE)
+
+# Date layouts tried in order; statements often print dates without a year
+DATE_FORMATS = ["%m/%d/%Y", "%m/%d/%y", "%Y-%m-%d", "%m/%d", "%m-%d"]
+
+# Year given to dates printed without one; a leap year, so "02/29" still parses
+NO_YEAR = 1904
+
+
+def _missing(values):
+    text = values.astype(str).str.strip()
+    return values.isna() | (text == "N/A") | (text == "")
+
+
+def to_cents(values):
+    """Money column as nullable Int64 cents, or None if a present value is not an amount."""
+    if pd.api.types.is_numeric_dtype(values):
+        amounts = values.to_numpy(dtype="float64", na_value=np.nan)
+    else:
+        missing = _missing(values)
+        parsed = pd.to_numeric(values.astype(str).str.replace(r"[$,\s]", "", regex=True).where(~missing), errors="coerce")
+        if (parsed.isna() & ~missing).any():
+            return None
+        amounts = parsed.to_numpy(dtype="float64", na_value=np.nan)
+    return pd.array(np.round(amounts * 100), dtype="Int64")
+
+
+def to_dates(values):
+    """Date column as datetime64, or None if no single layout fits every present value.
+
+    Dates printed without a year land in `NO_YEAR`.
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    missing = _missing(values)
+    text = values.astype(str).str.strip().where(~missing)
+    for fmt in DATE_FORMATS:
+        if "%y" in fmt.lower():
+            dates = pd.to_datetime(text, format=fmt, errors="coerce")
+        else:
+            separator = fmt[2]  # "%m/%d" -> "/"
+            dates = pd.to_datetime(text + f"{separator}{NO_YEAR}", format=f"{fmt}{separator}%Y", errors="coerce")
+        if not (dates.isna() & ~missing).any():
+            return dates
+    return None
+
+
+# Function to convert a table to the compact schema once, at extraction time
+def compact_frame(df):
+    """Store money as Int64 cents, dates as datetime64 and repeated descriptions/types as categoricals.
+
+    Columns are picked by name. A money or date column keeps its strings if
+    any value does not parse, so unexpected layouts are never lost. "N/A"
+    cells become missing values. `is_cents` recognises the money columns and
+    `display_frame` turns them back into dollars for display.
+    """
+    df = df.copy()
+    for col in df.columns:
+        converted = None
+        if AMOUNT_COLUMN.search(col):
+            converted = to_cents(df[col])
+        elif DATE_COLUMN.search(col):
+            converted = to_dates(df[col])
+        elif CATEGORY_COLUMN.search(col) and not pd.api.types.is_numeric_dtype(df[col]) and df[col].nunique() <= len(df) // 2:
+            converted = df[col].astype("category")  # Only pays off when labels repeat
+        if converted is not None:
+            df[col] = converted
+    return df
+
+
+def is_cents(values):
+    """True for a money column stored by `compact_frame`; nullable Int64 is used for nothing else."""
+    return isinstance(values.dtype, pd.Int64Dtype)
+
+
+def display_frame(df):
+    """Copy of a compact table with cents shown as dollars and year-less dates as month/day."""
+    columns = {}
+    for col in df.columns:
+        if is_cents(df[col]):
+            columns[col] = df[col].astype("Float64") / 100
+        elif pd.api.types.is_datetime64_any_dtype(df[col]) and (df[col].dropna().dt.year == NO_YEAR).all():
+            columns[col] = df[col].dt.strftime("%m/%d")
+    return df.assign(**columns) if columns else df
@@ -0,0 +1,387 @@
+"""Background extraction jobs: a SQLite broker and worker processes.
+
+The dashboard (or `python jobs.py submit`) queues a job of statements and
+polls its status; workers claim files, analyze them with the bank profiles
+and record each summary. Run as many workers as there are cores, on the
+machine holding the `job_db` file (SQLite's WAL mode needs shared memory,
+so the database cannot be shared over a network file system):
+
+    python jobs.py worker --processes 4
+    python jobs.py submit statements/ --bank chase
+    python jobs.py status <job id>
+    python jobs.py results <job id> --output chase.csv
+
+A claimed file is leased to its worker and the lease is renewed while the
+worker runs. If the worker dies, the lease runs out and another worker picks
+the file up; files already finished are never analyzed again, and results
+Azure already returned come from the result cache.
+"""
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+import pandas as pd
+from dotenv import load_dotenv
+from fields import clean_value
+
+# Default broker database, overridable with the job_db env var; PDFs are spooled next to it
+DEFAULT_JOB_DB = ".data/jobs.sqlite3"
+
+# Seconds a claimed file stays with its worker without a renewal (job_lease_seconds env var)
+DEFAULT_LEASE_SECONDS = 120
+
+# Attempts at a file before it is marked failed
+MAX_ATTEMPTS = 3
+
+# Seconds an idle worker waits before looking for work again
+IDLE_SECONDS = 1.0
+
+# Task states; a job is finished once none of its tasks is queued or running
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    bank TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    job_id TEXT NOT NULL REFERENCES jobs (id),
+    seq INTEGER NOT NULL,
+    bank TEXT NOT NULL,
+    file_name TEXT NOT NULL,
+    file_sha256 TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_until REAL,
+    summary TEXT,
+    error TEXT,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, lease_until);
+CREATE INDEX IF NOT EXISTS tasks_job ON tasks (job_id, seq);
+"""
+
+
+def get_lease_seconds():
+    return max(1.0, float(os.getenv("job_lease_seconds", DEFAULT_LEASE_SECONDS)))
+
+
+class JobQueue:
+    """SQLite-backed queue of statement files, safe to share between processes.
+
+    Each process opens its own `JobQueue`; within a process one connection is
+    shared between threads behind a lock. Claims run in an immediate
+    transaction, so two workers never take the same file.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.getenv("job_db", DEFAULT_JOB_DB)
+        self.spool = os.path.join(os.path.dirname(self.path) or ".", "job_files")
+        os.makedirs(self.spool, exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def _spool_path(self, sha256):
+        return os.path.join(self.spool, f"{sha256}.pdf")
+
+    def submit(self, bank, files):
+        """Queue `files`, a list of (name, PDF bytes), under `bank` ("auto" to detect it); returns the job id."""
+        job_id = uuid.uuid4().hex
+        rows = []
+        for seq, (name, file_bytes) in enumerate(files):
+            digest = hashlib.sha256(file_bytes).hexdigest()
+            path = self._spool_path(digest)
+            if not os.path.exists(path):
+                temp_path = f"{path}.{job_id}.tmp"
+                with open(temp_path, "wb") as f:
+                    f.write(file_bytes)
+                os.replace(temp_path, path)
+            rows.append((job_id, seq, bank, name, digest, QUEUED))
+
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self.conn.execute("INSERT INTO jobs (id, bank, created_at) VALUES (?, ?, ?)", (job_id, bank, time.time()))
+                self.conn.executemany(
+                    "INSERT INTO tasks (job_id, seq, bank, file_name, file_sha256, status) VALUES (?, ?, ?, ?, ?, ?)", rows,
+                )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        return job_id
+
+    def claim(self, worker, limit):
+        """Lease up to `limit` queued files, or files whose worker's lease ran out, to `worker`."""
+        now = time.time()
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self.conn.execute(
+                    "UPDATE tasks SET status = ?, error = ?, finished_at = ? WHERE status = ? AND lease_until < ? AND attempts >= ?",
+                    (FAILED, f"Gave up after {MAX_ATTEMPTS} attempts", now, RUNNING, now, MAX_ATTEMPTS),
+                )
+                rows = self.conn.execute(
+                    "SELECT id, job_id, bank, file_name, file_sha256, attempts FROM tasks"
+                    " WHERE status = ? OR (status = ? AND lease_until < ?) ORDER BY id LIMIT ?",
+                    (QUEUED, RUNNING, now, limit),
+                ).fetchall()
+                self.conn.executemany(
+                    "UPDATE tasks SET status = ?, worker = ?, lease_until = ?, attempts = attempts + 1 WHERE id = ?",
+                    [(RUNNING, worker, now + get_lease_seconds(), row[0]) for row in rows],
+                )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        columns = ["id", "job_id", "bank", "file_name", "file_sha256", "attempts"]
+        return [dict(zip(columns, row)) for row in rows]
+
+    def renew(self, worker, task_ids):
+        """Extend `worker`'s leases on the files it is still working on."""
+        if not task_ids:
+            return
+        with self._lock:
+            self.conn.executemany(
+                "UPDATE tasks SET lease_until = ? WHERE id = ? AND worker = ? AND status = ?",
+                [(time.time() + get_lease_seconds(), task_id, worker, RUNNING) for task_id in task_ids],
+            )
+
+    def complete(self, task_id, worker, row):
+        """Record a file's summary row; ignored if its lease has passed to another worker."""
+        with self._lock:
+            self.conn.execute(
+                "UPDATE tasks SET status = ?, summary = ?, error = NULL, finished_at = ? WHERE id = ? AND worker = ? AND status = ?",
+                (DONE, json.dumps({col: clean_value(value) for col, value in row.items()}, default=str), time.time(), task_id, worker, RUNNING),
+            )
+
+    def fail(self, task_id, worker, error, retry=False):
+        """Record a failure; with `retry` the file is queued again until it runs out of attempts."""
+        with self._lock:
+            self.conn.execute(
+                "UPDATE tasks SET status = CASE WHEN ? AND attempts < ? THEN ? ELSE ? END, error = ?, finished_at = ?"
+                " WHERE id = ? AND worker = ? AND status = ?",
+                (retry, MAX_ATTEMPTS, QUEUED, FAILED, error, time.time(), task_id, worker, RUNNING),
+            )
+
+    def file_bytes(self, sha256):
+        with open(self._spool_path(sha256), "rb") as f:
+            return f.read()
+
+    def status(self, job_id):
+        """{"total", "queued", "running", "done", "failed", "finished"} for one job."""
+        with self._lock:
+            counts = dict(self.conn.execute("SELECT status, COUNT(*) FROM tasks WHERE job_id = ? GROUP BY status", (job_id,)).fetchall())
+        status = {state: counts.get(state, 0) for state in (QUEUED, RUNNING, DONE, FAILED)}
+        status["total"] = sum(counts.values())
+        status["finished"] = status[DONE] + status[FAILED] == status["total"]
+        return status
+
+    def tasks(self, job_id):
+        """One row per file of the job, in submission order."""
+        with self._lock:
+            return pd.read_sql_query(
+                "SELECT seq, file_name, bank, status, attempts, worker, error, summary FROM tasks WHERE job_id = ? ORDER BY seq",
+                self.conn, params=(job_id,),
+            )
+
+    def results(self, job_id):
+        """The summary rows of the job's finished files, as written by cli.py."""
+        rows = []
+        for task in self.tasks(job_id).itertuples():
+            if task.summary:
+                rows.append(json.loads(task.summary))
+            elif task.status == FAILED:
+                rows.append({"File Name": task.file_name, "Bank": task.bank, "Error": task.error})
+        return rows
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue():
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = JobQueue()
+        return _queue
+
+
+# Function to analyze claimed files and record their summaries once each bank's group finishes
+def process_tasks(queue, worker, tasks, client, store=None):
+    from cache import get_result_cache
+    from cli import extract_statement, summarize
+    from preflight import PreflightError
+    from profiles import analysis_settings, get_profile
+    from routing import get_route_cache, route_batch
+    from splitting import analyze_batch_split, get_pages_per_chunk
+
+    files = {task["id"]: queue.file_bytes(task["file_sha256"]) for task in tasks}
+
+    auto = [task for task in tasks if task["bank"] == "auto"]
+    if auto:
+        banks = route_batch([files[task["id"]] for task in auto], client=client, route_cache=get_route_cache())
+        for task, bank in zip(auto, banks):
+            task["bank"] = bank or "generic"
+
+    groups = {}
+    for task in tasks:
+        groups.setdefault(task["bank"], []).append(task)
+
+    for bank, group in groups.items():
+        profile = get_profile(bank)
+        statements = {}  # Group index -> extracted data, summarized together below
+
+        def on_complete(i, result, completed):
+            task = group[i]
+            if isinstance(result, Exception):
+                # A file rejected by pre-flight fails the same way on every attempt
+                queue.fail(task["id"], worker, str(result) or type(result).__name__, retry=not isinstance(result, PreflightError))
+                return
+            statements[i] = extract_statement(profile, result)
+
+        analyze_batch_split(
+            client, os.getenv(profile.MODEL_ID_ENV), [files[task["id"]] for task in group],
+            pages_per_chunk=get_pages_per_chunk(), on_complete=on_complete, return_exceptions=True,
+            cache=get_result_cache(), keep_results=False, **analysis_settings(profile),
+        )
+
+        finished = [group[i] for i in statements]
+        rows = summarize(
+            profile, bank, [task["file_name"] for task in finished], list(statements.values()),
+            [files[task["id"]] for task in finished], store,
+        )
+        for task, row in zip(finished, rows):
+            if row["Error"]:
+                queue.fail(task["id"], worker, row["Error"])
+            else:
+                queue.complete(task["id"], worker, row)
+
+
+# Function to run one worker until stopped, or until the queue is empty with `once`
+def run_worker(worker=None, batch_size=None, once=False):
+    from analysis import get_max_concurrency
+    from client import get_client
+    from store import get_statement_store
+
+    load_dotenv()
+    worker = worker or f"{socket.gethostname()}:{os.getpid()}"
+    queue = JobQueue()
+    client = get_client()
+    store = get_statement_store()
+    batch_size = batch_size or get_max_concurrency() * 2
+
+    while True:
+        tasks = queue.claim(worker, batch_size)
+        if not tasks:
+            if once:
+                return
+            time.sleep(IDLE_SECONDS)
+            continue
+
+        # Keep the leases alive while the batch runs
+        done = threading.Event()
+        task_ids = [task["id"] for task in tasks]
+
+        def heartbeat():
+            while not done.wait(get_lease_seconds() / 3):
+                queue.renew(worker, task_ids)
+
+        renewer = threading.Thread(target=heartbeat, daemon=True)
+        renewer.start()
+        try:
+            process_tasks(queue, worker, tasks, client, store)
+        except Exception as e:
+            for task_id in task_ids:
+                queue.fail(task_id, worker, str(e) or type(e).__name__, retry=True)
+        finally:
+            done.set()
+            renewer.join()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Queue statements for background workers, or run a worker.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    worker_parser = commands.add_parser("worker", help="analyze queued statements")
+    worker_parser.add_argument("--processes", type=int, default=1, help="worker processes to start (default: 1)")
+    worker_parser.add_argument("--batch-size", type=int, help="files claimed at a time (default: twice max_concurrency)")
+    worker_parser.add_argument("--once", action="store_true", help="exit once the queue is empty")
+
+    submit_parser = commands.add_parser("submit", help="queue PDF files, directories or glob patterns as one job")
+    submit_parser.add_argument("inputs", nargs="+")
+    submit_parser.add_argument("--bank", required=True, help="bank profile, or auto to detect it per file")
+
+    status_parser = commands.add_parser("status", help="show a job's progress")
+    status_parser.add_argument("job_id")
+
+    results_parser = commands.add_parser("results", help="write a job's summary rows")
+    results_parser.add_argument("job_id")
+    results_parser.add_argument("--format", choices=["jsonl", "csv", "parquet", "xlsx"], default="jsonl")
+    results_parser.add_argument("--output", "-o", default="-")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    if args.command == "worker":
+        if args.processes <= 1:
+            run_worker(batch_size=args.batch_size, once=args.once)
+            return 0
+        processes = [
+            multiprocessing.Process(target=run_worker, kwargs={"batch_size": args.batch_size, "once": args.once})
+            for _ in range(args.processes)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        return 0
+
+    queue = JobQueue()
+    if args.command == "submit":
+        from cli import find_pdfs
+        from profiles import PROFILES
+
+        if args.bank != "auto" and args.bank not in PROFILES:
+            parser.error(f"unknown bank '{args.bank}'")
+        paths = find_pdfs(args.inputs)
+        if not paths:
+            parser.error("no PDF files matched")
+        files = []
+        for path in paths:
+            with open(path, "rb") as f:
+                files.append((path, f.read()))
+        print(queue.submit(args.bank, files))
+    elif args.command == "status":
+        print(json.dumps(queue.status(args.job_id)))
+    else:
+        from export import ROW_COLUMNS, open_writer
+        from profiles import PROFILES, get_profile
+
+        rows = queue.results(args.job_id)
+        columns = list(ROW_COLUMNS)
+        for bank in dict.fromkeys(row["Bank"] for row in rows if row["Bank"] in PROFILES):
+            columns.extend(col for col in get_profile(bank).SUMMARY_COLUMNS if col not in columns)
+        writer = open_writer(args.format, args.output, columns)
+        try:
+            for row in rows:
+                writer.write(row)
+        finally:
+            writer.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
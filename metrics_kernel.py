@@ -0,0 +1,121 @@
+"""Balance and deposit metrics for many statements in one vectorized pass.
+
+Every bank profile reduces a statement to two flat arrays and lets this
+module do the arithmetic, so the figures mean the same thing for every bank:
+
+- daily balances: one end-of-day balance per statement day. Missing
+  values (NaN) are ignored.
+- average daily balance: the mean of all of a statement's daily balances,
+  not a mean of per-table means.
+- negative days: the number of daily balances below zero.
+- negative-day ratio: negative days / daily balances, a fraction in [0, 1].
+- deposits: one amount per deposit entry. The deposit count is the number
+  of positive amounts, and the deposit total is their sum.
+
+Many statements are passed as their values concatenated, plus a count per
+statement (the length of each one's slice), and every metric comes back as
+one array entry per statement.
+"""
+import numpy as np
+import pandas as pd
+from fields import is_cents
+
+
+def _statement_ids(counts):
+    return np.repeat(np.arange(len(counts)), counts)
+
+
+# Function to compute every metric for a batch of statements
+def compute_metrics(balances, balance_counts, deposits=None, deposit_counts=None):
+    """Return {metric: array with one value per statement}.
+
+    `balances` holds every statement's daily balances back to back and
+    `balance_counts[i]` says how many belong to statement i; `deposits` and
+    `deposit_counts` work the same way. Statements without balances get NaN
+    averages and ratios.
+    """
+    balance_counts = np.asarray(balance_counts, dtype=np.int64)
+    balances = np.asarray(balances, dtype=np.float64)
+    n = len(balance_counts)
+
+    ids = _statement_ids(balance_counts)
+    valid = ~np.isnan(balances)
+    ids, balances = ids[valid], balances[valid]
+
+    days = np.bincount(ids, minlength=n)
+    total = np.bincount(ids, weights=balances, minlength=n).astype(np.float64)
+    negative = np.bincount(ids[balances < 0], minlength=n)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        average = np.where(days > 0, total / days, np.nan)
+        ratio = np.where(days > 0, negative / days, np.nan)
+
+    metrics = {
+        "balance_days": days,
+        "total_balance": total,
+        "average_daily_balance": average,
+        "negative_days": negative,
+        "negative_day_ratio": ratio,
+        "deposit_count": np.zeros(n, dtype=np.int64),
+        "deposit_total": np.zeros(n, dtype=np.float64),
+    }
+
+    if deposits is not None:
+        deposits = np.asarray(deposits, dtype=np.float64)
+        deposit_ids = _statement_ids(np.asarray(deposit_counts, dtype=np.int64))
+        positive = deposits > 0  # NaN compares False, so missing entries drop out
+        metrics["deposit_count"] = np.bincount(deposit_ids[positive], minlength=n)
+        metrics["deposit_total"] = np.bincount(deposit_ids[positive], weights=deposits[positive], minlength=n).astype(np.float64)
+
+    return metrics
+
+
+# Function to compute the metrics of a single statement
+def statement_metrics(balances, deposits=None):
+    """`compute_metrics` for one statement, returned as plain Python scalars."""
+    balances = np.asarray(balances, dtype=np.float64)
+    deposits = None if deposits is None else np.asarray(deposits, dtype=np.float64)
+    metrics = compute_metrics(
+        balances, [len(balances)], deposits, None if deposits is None else [len(deposits)],
+    )
+    return {name: values[0].item() for name, values in metrics.items()}
+
+
+# Function to compute a profile's summaries for many statements at once
+def batch_metrics(profile, statements_data):
+    """Summaries for a list of extracted statements, with one kernel pass for all of them.
+
+    `profile` must provide `metric_inputs(extracted_data)`, returning
+    (daily balances, deposits or None), and `summarize(extracted_data,
+    values)`; its `metrics` is the same computation for a single statement.
+    Profiles without them get their `metrics` called per statement.
+    """
+    if not hasattr(profile, "metric_inputs"):
+        return [profile.metrics(extracted_data) for extracted_data in statements_data]
+
+    inputs = [profile.metric_inputs(extracted_data) for extracted_data in statements_data]
+    balances = [np.asarray(balances, dtype=np.float64) for balances, _ in inputs]
+    deposits = [np.asarray(deposits if deposits is not None else [], dtype=np.float64) for _, deposits in inputs]
+
+    metrics = compute_metrics(
+        np.concatenate(balances) if balances else np.empty(0), [len(values) for values in balances],
+        np.concatenate(deposits) if deposits else np.empty(0), [len(values) for values in deposits],
+    )
+    return [
+        profile.summarize(extracted_data, {name: values[i].item() for name, values in metrics.items()})
+        for i, extracted_data in enumerate(statements_data)
+    ]
+
+
+def parse_amounts(values):
+    """Parse a Series of amounts such as "$1,234.50" or "-12.00" into float64 dollars.
+
+    Compact-schema cents columns are scaled back to dollars and unparseable
+    values become NaN.
+    """
+    if is_cents(values):
+        return values.to_numpy(dtype=np.float64, na_value=np.nan) / 100
+    if pd.api.types.is_numeric_dtype(values):
+        return values.to_numpy(dtype=np.float64, na_value=np.nan)
+    cleaned = values.astype(str).str.replace(r"[^\d.-]", "", regex=True)
+    return pd.to_numeric(cleaned, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
@@ -0,0 +1,171 @@
+"""When to poll an analyze operation for its result.
+
+Left alone, the SDK polls straight after submitting a document and then
+once a second (or per Retry-After), so short statements sleep past their
+finish and long ones are polled many times before they can be done.
+`PollingStrategy` instead:
+
+- waits before the first poll for the time the document is expected to
+  take, a base delay plus a delay per page;
+- scales that estimate by the service times actually reported, so it
+  follows the model's real speed (tracked per model ID). Until a model's
+  first service time is known, no wait is longer than the SDK's own poll
+  interval, so short statements are never picked up later than the SDK
+  would pick them up;
+- after the estimate, polls at intervals growing with the time waited;
+- never polls sooner than a Retry-After the service sent, unless the
+  profile turns `honor_retry_after` off.
+
+A bank profile can tune its model's schedule with a `POLLING` dict of
+`PollingStrategy` arguments, passed along with its analyze calls. Set the `polling` env var to "sdk" to use the
+SDK's own schedule, e.g. to compare the two with the timing breakdown.
+"""
+import io
+import os
+import re
+import threading
+import time
+from azure.core.polling.base_polling import LROBasePolling
+from throttle import retry_after_seconds
+
+# Seconds before a document's first poll: a base plus a delay per page
+DEFAULT_INITIAL_DELAY = 1.0
+DEFAULT_PAGE_DELAY = 0.5
+
+# The SDK's interval between polls, the longest wait before a model's speed is learned
+SDK_POLL_INTERVAL = 1.0
+
+# Bounds on the interval between later polls, in seconds
+DEFAULT_MIN_INTERVAL = 0.25
+DEFAULT_MAX_INTERVAL = 5.0
+
+# Share of the expected time to wait before the first poll, so a document
+# finishing a little early is not held back
+FIRST_POLL_FRACTION = 0.8
+
+# Past the estimate, poll again after this share of the time waited so far
+LATE_POLL_FRACTION = 0.25
+
+# Weight of each new service time in the running estimate
+SMOOTHING = 0.2
+
+PAGE_OBJECT = re.compile(rb"/Type\s*/Page(?![a-zA-Z])")
+
+
+def count_pages(file_bytes):
+    """Pages in a PDF, read with pypdf when installed; 1 if it cannot be told."""
+    try:
+        from pypdf import PdfReader
+        return max(1, len(PdfReader(io.BytesIO(file_bytes)).pages))
+    except Exception:
+        return max(1, len(PAGE_OBJECT.findall(file_bytes)))
+
+
+def count_page_range(pages):
+    """Pages named by an analyze `pages` parameter such as "1,3-5"."""
+    count = 0
+    for part in str(pages).split(","):
+        first, _, last = part.partition("-")
+        count += int(last) - int(first) + 1 if last else 1
+    return max(1, count)
+
+
+class PollingStrategy:
+    """Poll schedule for one model, learning how fast the model really is.
+
+    The expected time for an n page document starts at `initial_delay +
+    page_delay * n` and is scaled by a running average of reported service
+    time over expected time, seeded by the first reported time. Until then,
+    every wait is capped at `SDK_POLL_INTERVAL`.
+    """
+
+    def __init__(self, initial_delay=DEFAULT_INITIAL_DELAY, page_delay=DEFAULT_PAGE_DELAY, min_interval=DEFAULT_MIN_INTERVAL, max_interval=DEFAULT_MAX_INTERVAL, honor_retry_after=True):
+        self.initial_delay = initial_delay
+        self.page_delay = page_delay
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.honor_retry_after = honor_retry_after
+        self.scale = 1.0
+        self.learned = False
+        self._lock = threading.Lock()
+
+    def expected_seconds(self, pages):
+        with self._lock:
+            return self.scale * (self.initial_delay + self.page_delay * pages)
+
+    def observe(self, service_seconds, pages):
+        """Fold one reported service time into the estimate."""
+        prior = self.initial_delay + self.page_delay * pages
+        with self._lock:
+            ratio = min(10.0, max(0.1, service_seconds / prior))
+            # The first observation replaces the starting guess outright
+            self.scale += (SMOOTHING if self.learned else 1.0) * (ratio - self.scale)
+            self.learned = True
+
+    def first_delay(self, pages):
+        delay = self.expected_seconds(pages) * FIRST_POLL_FRACTION
+        return delay if self.learned else min(delay, SDK_POLL_INTERVAL)
+
+    def next_delay(self, waited, pages, retry_after=None):
+        """Seconds until the next poll, `waited` seconds after the document was accepted."""
+        remaining = self.expected_seconds(pages) - waited
+        delay = remaining if remaining > 0 else waited * LATE_POLL_FRACTION
+        delay = min(self.max_interval, max(self.min_interval, delay))
+        if not self.learned:
+            delay = min(delay, SDK_POLL_INTERVAL)
+        if retry_after and self.honor_retry_after:
+            delay = max(delay, retry_after)
+        return delay
+
+
+class AdaptivePolling(LROBasePolling):
+    """The SDK's polling method on a `PollingStrategy` schedule, counting its polls."""
+
+    def __init__(self, strategy, pages, **kwargs):
+        super().__init__(**kwargs)
+        self.strategy = strategy
+        self.pages = pages
+        self.polls = 0
+        self._accepted = None
+
+    def initialize(self, client, initial_response, deserialization_callback):
+        # Runs once the service has accepted the upload, so upload time is not counted as waiting
+        self._accepted = time.monotonic()
+        super().initialize(client, initial_response, deserialization_callback)
+
+    def _poll(self):
+        # The SDK polls once straight away; wait for the document's expected time first
+        if not self.finished():
+            self._sleep(max(0.0, self.strategy.first_delay(self.pages) - (time.monotonic() - self._accepted)))
+        super()._poll()
+
+    def _extract_delay(self):
+        retry_after = retry_after_seconds(self._pipeline_response.http_response.headers)
+        return self.strategy.next_delay(time.monotonic() - self._accepted, self.pages, retry_after)
+
+    def update_status(self):
+        self.polls += 1
+        super().update_status()
+
+
+_strategies = {}
+_strategies_lock = threading.Lock()
+
+
+# Function to get the process-wide polling strategy for a model
+def get_polling_strategy(model_id, settings=None):
+    """Return the `PollingStrategy` for `model_id` built with `settings`, a profile's `POLLING` dict."""
+    key = (model_id, tuple(sorted((settings or {}).items())))
+    with _strategies_lock:
+        if key not in _strategies:
+            _strategies[key] = PollingStrategy(**(settings or {}))
+        return _strategies[key]
+
+
+# Function to build the polling method for one analyze call
+def polling_method(client, model_id, pages, settings=None):
+    """An `AdaptivePolling` for `begin_analyze_document(polling=...)`, or None for the SDK default."""
+    if os.getenv("polling", "adaptive").lower() == "sdk":
+        return None
+    endpoint = client._config.endpoint  # The URL the SDK formats operation paths with
+    return AdaptivePolling(get_polling_strategy(model_id, settings), pages, path_format_arguments={"endpoint": endpoint})
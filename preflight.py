@@ -0,0 +1,151 @@
+"""Local checks on each PDF before it is uploaded.
+
+`prepare_batch` runs ahead of every analysis batch:
+
+- files that are not PDFs, cannot be parsed, are encrypted or have no pages
+  are rejected with a `PreflightError` straight away, without a round trip
+  to Azure;
+- with page dropping on (the `drop_pages` env var, or cli.py --drop-pages),
+  pages headed by one of the profile's `IRRELEVANT_PAGES`, such as a check
+  images section or a marketing insert, are removed and the remaining pages
+  are rewritten with identical objects merged. Profiles without the list
+  keep every page;
+- the same statement appearing twice in a batch is counted here and
+  analyzed once by `analysis.analyze_batch`.
+
+Page checks need the optional pypdf package; without it only the file
+header is checked and nothing is dropped.
+"""
+import hashlib
+import io
+import os
+import re
+
+# Lines at the top of a page searched for its heading, past the bank's running header
+HEADING_LINES = 5
+
+
+class PreflightError(ValueError):
+    """A file rejected before upload; its message says why."""
+
+
+def get_drop_pages():
+    """Whether irrelevant pages are dropped before upload (the `drop_pages` env var)."""
+    return os.getenv("drop_pages", "").lower() in ("1", "true", "yes", "on")
+
+
+def _open(file_bytes):
+    if not file_bytes.lstrip()[:5] == b"%PDF-":
+        raise PreflightError("Not a PDF file")
+
+    try:
+        from pypdf import PasswordType, PdfReader
+    except ImportError:
+        return None
+
+    try:
+        reader = PdfReader(io.BytesIO(file_bytes))
+        # PDFs with only an owner password open with an empty user password, as they do in Azure
+        locked = reader.is_encrypted and reader.decrypt("") == PasswordType.NOT_DECRYPTED
+        page_count = 0 if locked else len(reader.pages)
+    except Exception as e:
+        raise PreflightError(f"Unreadable PDF: {e}") from e
+    if locked:
+        raise PreflightError("Encrypted PDF; remove the password before uploading")
+    if page_count == 0:
+        raise PreflightError("PDF has no pages")
+    return reader
+
+
+def page_headings(text, lines=HEADING_LINES):
+    """The first `lines` non-blank lines of a page's text, with whitespace collapsed."""
+    headings = (" ".join(line.split()) for line in text.splitlines())
+    return [line for line in headings if line][:lines]
+
+
+def drop_irrelevant_pages(reader, patterns):
+    """PDF bytes without the pages headed by a line matching `patterns`, and how many were dropped.
+
+    A pattern must match a whole heading line, so a page titled "Check
+    Images" is dropped but one that mentions check images in passing is not.
+    The first page is always kept, and a PDF with nothing to drop comes back
+    as None so the original bytes (and their cache entries) are used.
+    """
+    from pypdf import PdfWriter
+
+    pattern = re.compile("|".join(f"(?:{p})" for p in patterns), re.IGNORECASE)
+    keep = [0]
+    for number, page in enumerate(reader.pages[1:], 1):
+        try:
+            text = page.extract_text() or ""
+        except Exception:
+            text = ""
+        if not any(pattern.fullmatch(line) for line in page_headings(text)):
+            keep.append(number)
+
+    dropped = len(reader.pages) - len(keep)
+    if not dropped:
+        return None, 0
+
+    writer = PdfWriter()
+    for number in keep:
+        writer.add_page(reader.pages[number])
+    writer.compress_identical_objects()
+    output = io.BytesIO()
+    writer.write(output)
+    return output.getvalue(), dropped
+
+
+# Function to check, slim and count duplicates in a batch of PDFs before upload
+def prepare_batch(files, irrelevant_pages=None, drop_pages=None, report=None):
+    """Return (files to analyze, errors), both lined up with `files`.
+
+    A rejected file keeps its original bytes and gets a `PreflightError` in
+    `errors` (None otherwise). `report`, if given, is filled with the batch
+    totals: files, rejected, duplicates, pages_dropped, bytes_in, bytes_sent
+    and bytes_saved (bytes not uploaded thanks to the checks, page dropping
+    and duplicate detection).
+    """
+    drop_pages = (get_drop_pages() if drop_pages is None else drop_pages) and bool(irrelevant_pages)
+    prepared, errors = [], []
+    totals = {"files": len(files), "rejected": 0, "duplicates": 0, "pages_dropped": 0, "bytes_in": 0, "bytes_sent": 0}
+    seen = set()
+
+    for file_bytes in files:
+        totals["bytes_in"] += len(file_bytes)
+        try:
+            reader = _open(file_bytes)
+        except PreflightError as e:
+            prepared.append(file_bytes)
+            errors.append(e)
+            totals["rejected"] += 1
+            continue
+
+        if drop_pages and reader is not None:
+            slimmed, dropped = drop_irrelevant_pages(reader, irrelevant_pages)
+            if slimmed is not None and len(slimmed) < len(file_bytes):
+                file_bytes = slimmed
+                totals["pages_dropped"] += dropped
+        prepared.append(file_bytes)
+        errors.append(None)
+
+        digest = hashlib.sha256(file_bytes).digest()
+        if digest in seen:
+            totals["duplicates"] += 1
+        else:
+            seen.add(digest)
+            totals["bytes_sent"] += len(file_bytes)
+
+    totals["bytes_saved"] = totals["bytes_in"] - totals["bytes_sent"]
+    if report is not None:
+        report.update(totals)
+    return prepared, errors
+
+
+def describe(report):
+    """One-line summary of a `prepare_batch` report."""
+    return (
+        f"{report['duplicates']} duplicate(s), {report['rejected']} rejected, "
+        f"{report['pages_dropped']} page(s) dropped, {report['bytes_saved'] / 1024:,.1f} KB of "
+        f"{report['bytes_in'] / 1024:,.1f} KB not uploaded"
+    )
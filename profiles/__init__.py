@@ -0,0 +1,53 @@
+import importlib
+
+# Bank profile registry. Modules are only imported when a profile is used:
+# "module" implements extract(result) and metrics(extracted_data) with no UI
+# dependencies, "view" renders the results in Streamlit. "markers" is text
+# that identifies the bank on a statement's first page, used for routing.
+# Summary columns sharing a name across profiles become one export column,
+# so they must hold the same unit, e.g. "Average Negative Days (%)".
+PROFILES = {
+    "chase": {
+        "label": "Chase", "module": "profiles.chase", "view": "views.chase",
+        "markers": ["JPMorgan Chase", "Chase.com", "Chase Bank"],
+    },
+    "bofa": {
+        "label": "Bank of America", "module": "profiles.bank_of_america", "view": "views.bank_of_america",
+        "markers": ["Bank of America", "bankofamerica.com"],
+    },
+    "wellsfargo": {
+        "label": "Wells Fargo", "module": "profiles.wells_fargo", "view": "views.wells_fargo",
+        "markers": ["Wells Fargo", "wellsfargo.com"],
+    },
+    "generic": {"label": "Generic", "module": "profiles.generic", "view": "views.generic", "markers": []},
+}
+
+
+def _entry(name):
+    if name not in PROFILES:
+        raise ValueError(f"Unknown bank profile '{name}'. Choose from: {', '.join(PROFILES)}")
+    return PROFILES[name]
+
+
+def profile_label(name):
+    return _entry(name)["label"]
+
+
+def get_profile(name):
+    """Import and return the extraction/metrics module for `name`."""
+    return importlib.import_module(_entry(name)["module"])
+
+
+def get_view(name):
+    """Import and return the Streamlit view module for `name`."""
+    return importlib.import_module(_entry(name)["view"])
+
+
+def analysis_settings(profile):
+    """Keyword arguments for `splitting.analyze_batch_split` and `review.review_document`
+    from the profile's optional IRRELEVANT_PAGES and POLLING.
+
+    Profiles can share a model ID (generic uses Chase's), so these are passed
+    with the profile rather than looked up from the model.
+    """
+    return {"irrelevant_pages": getattr(profile, "IRRELEVANT_PAGES", None), "polling_settings": getattr(profile, "POLLING", None)}
@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+from fields import compact_frame, field_to_frame, to_number
+from metrics_kernel import parse_amounts, statement_metrics
+from telemetry import traced
+
+# Env var holding the custom model trained on Bank of America statements
+MODEL_ID_ENV = "model_id3"
+
+# Summary values reported per statement, in export column order
+SUMMARY_COLUMNS = [
+    "Total Deposit Amount", "Number of Deposits", "Total Daily Ledger Balance",
+    "Average Daily Ledger Balance", "Negative Balance Days", "Average Negative Days (%)",
+]
+
+# Headings of pages with no statement data, dropped before upload with
+# drop_pages on (see preflight.drop_irrelevant_pages)
+IRRELEVANT_PAGES = [r"check images", r"special offers? for you"]
+
+
+# Function to extract fields, tables and deposit figures from response
+@traced("extract", profile="bofa")
+def extract(result):
+    """Return the extracted fields and tables, or None if no document was found."""
+    if not (hasattr(result, "documents") and result.documents):
+        return None
+
+    extracted_data = {}
+    doc = result.documents[0]
+
+    deposit_amount = "N/A"
+    number_of_deposits = "N/A"
+
+    for key, value in doc.fields.items():
+        key_lower = key.lower()  # Convert key to lowercase for flexible matching
+        
+        # Extract value safely
+        if isinstance(value, dict) and "valueString" in value:
+            field_value = value["valueString"]
+        elif value.type == "string":
+            field_value = value.value_string
+        elif value.type in ["float", "integer"]:
+            field_value = str(value.value_number)  # Convert numbers to strings
+        else:
+            field_value = "N/A"
+
+        # Clean up deposit amount (remove commas and convert to float)
+        if key_lower in ["total deposit amount", "depositamount"] and value.confidence > 0.9:
+            deposit_amount = field_value.replace(",", "") if field_value.replace(",", "").replace(".", "").isdigit() else "N/A"
+        
+        elif key_lower in ["number of deposits", "no.of.deposits"] and value.confidence > 0.9:
+            number_of_deposits = field_value
+
+        # Handle table data
+        elif value.type == "array":
+            extracted_data[key] = compact_frame(field_to_frame(value))  # Store table data
+        else:
+            extracted_data[key] = field_value if field_value else "N/A"
+
+    extracted_data["Total Deposit Amount"] = deposit_amount
+    extracted_data["Number of Deposits"] = number_of_deposits
+
+    return extracted_data
+
+
+def metric_inputs(extracted_data):
+    """Every value in any "Balance" column, across all tables, as daily balances for `metrics_kernel`."""
+    values = [
+        parse_amounts(data[col])
+        for data in extracted_data.values() if isinstance(data, pd.DataFrame)
+        for col in data.columns if "Balance" in col
+    ]
+    return (np.concatenate(values) if values else np.empty(0)), None
+
+
+def summarize(extracted_data, values):
+    """Format kernel values as this profile's summary; statements without balances report zeros."""
+    has_balances = values["balance_days"] > 0
+    return {
+        "Total Deposit Amount": extracted_data.get("Total Deposit Amount", "N/A"),
+        "Number of Deposits": extracted_data.get("Number of Deposits", "N/A"),
+        "Total Daily Ledger Balance": values["total_balance"],
+        # Mean of all daily balances, so a long table is not outweighed by a short one
+        "Average Daily Ledger Balance": values["average_daily_balance"] if has_balances else 0,
+        "Negative Balance Days": values["negative_days"],
+        "Average Negative Days (%)": round(values["negative_day_ratio"] * 100, 2) if has_balances else 0,
+    }
+
+
+def statement_deposits(extracted_data):
+    """(count, total) of deposits as printed on the statement, or None if the model did not read both."""
+    count = to_number(extracted_data.get("Number of Deposits"))
+    total = to_number(extracted_data.get("Total Deposit Amount"))
+    return None if count is None or total is None else (int(count), total)
+
+
+# Function to compute ledger balance statistics across every balance table
+@traced("metrics", profile="bofa")
+def metrics(extracted_data):
+    return summarize(extracted_data, statement_metrics(*metric_inputs(extracted_data)))
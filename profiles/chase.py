@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+import re
+from fields import compact_frame, field_to_frame, to_number
+from metrics_kernel import parse_amounts, statement_metrics
+from telemetry import traced
+
+# Env var holding the custom model trained on Chase statements
+MODEL_ID_ENV = "model_id"
+
+# Summary values reported per statement, in export column order
+SUMMARY_COLUMNS = [
+    "Average Daily Balance", "Total Negative Days", "Average Negative Days (%)",
+    "No.Of.Depositsandadditions", "Totalamountofdeposits",
+]
+
+# Headings of pages with no statement data, dropped before upload with
+# drop_pages on (see preflight.drop_irrelevant_pages)
+IRRELEVANT_PAGES = [r"check images", r"this page intentionally left blank"]
+
+
+# Function to extract balance data from response
+@traced("extract", profile="chase")
+def extract(result):
+    extracted_data = {}
+
+    for key, value in result.documents[0].fields.items():
+        if value.type == "array":
+            df = field_to_frame(value)
+            df.columns = [col.title() for col in df.columns]
+            df = compact_frame(df)
+
+            if "DailyEndingBalance" in key:
+                extracted_data["Daily Ending Balance"] = df
+            else:
+                extracted_data[key.replace("_", " ").title()] = df
+        else:
+            formatted_key = key.replace("_", " ").title()
+            extracted_data[formatted_key] = value.value_string if value.value_string else "N/A"
+
+    return extracted_data
+
+
+def _amount_columns(balance_df):
+    return [col for col in balance_df.columns if re.match(r"Amount(_\d+)?", col, re.IGNORECASE)]
+
+
+def _dated(dates):
+    present = dates.notna().to_numpy()
+    if pd.api.types.is_datetime64_any_dtype(dates):
+        return present
+    return present & (dates != "N/A").to_numpy()
+
+
+def daily_balances(balance_df):
+    """Every dated balance, reading each Date/Amount column pair and skipping missing dates."""
+    date_columns = [col for col in balance_df.columns if re.match(r"Date(_\d+)?", col, re.IGNORECASE)]
+    values = [
+        parse_amounts(balance_df[amount_col])[_dated(balance_df[date_col])]
+        for date_col, amount_col in zip(date_columns, _amount_columns(balance_df))
+    ]
+    return np.concatenate(values) if values else np.empty(0)
+
+
+def _balance_summary(values):
+    if not values["balance_days"]:
+        return "N/A", values["negative_days"], "N/A"
+
+    avg_daily_balance = round(values["average_daily_balance"], 2)
+    avg_negative_days = round(values["negative_day_ratio"] * 100, 2)
+    return avg_daily_balance, values["negative_days"], avg_negative_days
+
+
+def metric_inputs(extracted_data):
+    """Daily balances for `metrics_kernel`; deposit figures are read off the statement instead."""
+    balance_df = extracted_data.get("Daily Ending Balance")
+    if balance_df is None:
+        return np.empty(0), None
+    return daily_balances(balance_df), None
+
+
+def summarize(extracted_data, values):
+    """Format kernel values as this profile's summary."""
+    balance_df = extracted_data.get("Daily Ending Balance")
+    if balance_df is not None and _amount_columns(balance_df):
+        avg_daily_balance, total_negative_days, avg_negative_days = _balance_summary(values)
+    else:
+        avg_daily_balance, total_negative_days, avg_negative_days = "N/A", "N/A", "N/A"
+
+    summary = {
+        "Average Daily Balance": avg_daily_balance,
+        "Total Negative Days": total_negative_days,
+        "Average Negative Days (%)": avg_negative_days,
+    }
+
+    # Deposit figures are read straight off the statement when the model finds them
+    for key in ["No.Of.Depositsandadditions", "Totalamountofdeposits"]:
+        if key in extracted_data:
+            summary[key] = extracted_data[key]
+
+    return summary
+
+
+def statement_deposits(extracted_data):
+    """(count, total) of deposits as printed on the statement, or None if the model did not read both."""
+    count = to_number(extracted_data.get("No.Of.Depositsandadditions"))
+    total = to_number(extracted_data.get("Totalamountofdeposits"))
+    return None if count is None or total is None else (int(count), total)
+
+
+# Function to compute the per-statement summary shown on the dashboard
+@traced("metrics", profile="chase")
+def metrics(extracted_data):
+    return summarize(extracted_data, statement_metrics(*metric_inputs(extracted_data)))
@@ -0,0 +1,64 @@
+import pandas as pd
+import re
+from fields import compact_frame, field_to_frame
+from metrics_kernel import parse_amounts
+from telemetry import traced
+
+# Env var holding the custom model used by the generic extractor
+MODEL_ID_ENV = "model_id"
+
+# Summary values reported per statement, in export column order
+SUMMARY_COLUMNS = ["Average Daily  Balance", "Negative Days"]
+
+
+# Function to extract every field and table from response
+@traced("extract", profile="generic")
+def extract(result):
+    extracted_data = {}
+
+    # Loop through detected fields in JSON response
+    for key, value in result.documents[0].fields.items():
+        if value.type == "array":
+            df = compact_frame(field_to_frame(value))
+
+            # If table matches "DailyEndingBalance" structure, process balances
+            if "DailyEndingBalance" in key:
+                extracted_data["DailyEndingBalance"] = df
+
+            extracted_data[key] = df
+
+        else:
+            extracted_data[key] = value.value_string if value.value_string else "N/A"
+
+    return extracted_data
+
+
+# Function to compute balance metrics from the "DailyEndingBalance" table
+@traced("metrics", profile="generic")
+def metrics(extracted_data):
+    if "DailyEndingBalance" in extracted_data:
+        balance_df = extracted_data["DailyEndingBalance"]
+
+        # Extract all "AMOUNT" columns dynamically
+        amount_columns = [col for col in balance_df.columns if re.match(r"AMOUNT(_\d+)?", col)]
+
+        if amount_columns:
+            # Balances in dollars; unparseable amounts count as 0
+            amounts = pd.DataFrame({col: parse_amounts(balance_df[col]) for col in amount_columns}).fillna(0)
+
+            # Compute Average Daily Balance
+            all_amounts = amounts.values.flatten()
+            all_amounts = all_amounts[all_amounts != 0]  # Remove zero balances if they represent missing data
+            avg_daily_balance = all_amounts.mean() if len(all_amounts) > 0 else 0
+
+            # Compute Negative Days (any column with a negative balance)
+            negative_days = (amounts < 0).any(axis=1).sum()
+        else:
+            avg_daily_balance, negative_days = "N/A", "N/A"
+    else:
+        avg_daily_balance, negative_days = "N/A", "N/A"
+
+    return {
+        "Average Daily  Balance": avg_daily_balance,
+        "Negative Days": negative_days,
+    }
@@ -0,0 +1,142 @@
+import numpy as np
+import pandas as pd
+import re
+from fields import compact_frame, field_to_frame
+from metrics_kernel import parse_amounts, statement_metrics
+from telemetry import traced
+
+# Env var holding the custom model trained on Wells Fargo statements
+MODEL_ID_ENV = "model_id2"
+
+# Summary values reported per statement, in export column order
+SUMMARY_COLUMNS = [
+    "Total Count", "Total Balance", "Average Balance", "Negative Days Count",
+    "Average Negative Days (%)", "No.of.Deposits", "Total Amount of Deposits",
+]
+
+# Poll schedule for the model (see polling.PollingStrategy): every page
+# carries a transaction table, so pages cost more than the default
+POLLING = {"initial_delay": 1.0, "page_delay": 0.8}
+
+# Headings of pages with no statement data, dropped before upload with
+# drop_pages on (see preflight.drop_irrelevant_pages)
+IRRELEVANT_PAGES = [r"check images", r"images? of (?:your )?paid checks"]
+
+# Transaction history tables the model emits, one per statement page
+TRANSACTION_TABLES = ["TranscationHistory_page1", "TranscationHistory_page2"]
+TRANSACTION_TABLE = re.compile(r"^TranscationHistory_page(\d+)$")
+
+
+# Function to extract fields and tables from response
+@traced("extract", profile="wellsfargo")
+def extract(result):
+    """Return the extracted fields and tables, or None if no document was found."""
+    if not (hasattr(result, "documents") and result.documents):
+        return None
+
+    extracted_data = {}
+    doc = result.documents[0]
+
+    for key, value in doc.fields.items():
+        if value.type == "array":
+            extracted_data[key] = compact_frame(field_to_frame(value))
+        else:
+            extracted_data[key] = value.value_string if value.value_string else "N/A"
+
+    return extracted_data
+
+
+def ending_balances(extracted_data):
+    """All ending daily balances across the statement's tables, in order."""
+    balances = []
+    for data in extracted_data.values():
+        if isinstance(data, pd.DataFrame) and "Ending daily balance" in data.columns:
+            amounts = parse_amounts(data["Ending daily balance"])
+            balances.extend(amounts[~np.isnan(amounts)].tolist())
+    return balances
+
+
+def transaction_tables(extracted_data):
+    """Transaction history table names in page order, including pages past the second.
+
+    Statements analyzed in page-range chunks can carry more than the two
+    tables the model was trained on; page 1 and 2 are always listed.
+    """
+    pages = {key: int(match.group(1)) for key in extracted_data if (match := TRANSACTION_TABLE.match(key))}
+    pages.update({key: i + 1 for i, key in enumerate(TRANSACTION_TABLES)})
+    return sorted(pages, key=pages.get)
+
+
+def transaction_history(extracted_data):
+    """All transaction history tables concatenated into one DataFrame, in page order."""
+    tables = [extracted_data[key] for key in transaction_tables(extracted_data) if key in extracted_data]
+    return pd.concat(tables, ignore_index=True) if tables else pd.DataFrame()
+
+
+def _deposit_columns(df):
+    return [col for col in df.columns if "deposit" in col.lower() or "credit" in col.lower()]
+
+
+def deposit_data(extracted_data):
+    """Count deposits and total deposit amount per transaction history table."""
+    tables = transaction_tables(extracted_data)
+    deposit_counts = {key: 0 for key in tables}
+    total_deposits = {key: 0.0 for key in tables}
+
+    for key in tables:
+        if key not in extracted_data:
+            continue
+
+        # Count positive deposit entries and sum them, as metrics_kernel does
+        for col in _deposit_columns(extracted_data[key]):
+            deposits = parse_amounts(extracted_data[key][col])
+            deposits = deposits[deposits > 0]
+            deposit_counts[key] += len(deposits)
+            total_deposits[key] += deposits.sum()
+
+    return deposit_counts, total_deposits
+
+
+def metric_inputs(extracted_data):
+    """Daily balances and deposit amounts for `metrics_kernel`.
+
+    The last ending balance is left out of the daily balances, as it always
+    has been for this profile's averages.
+    """
+    balances = ending_balances(extracted_data)[:-1]
+    deposits = [
+        parse_amounts(extracted_data[key][col])
+        for key in transaction_tables(extracted_data) if key in extracted_data
+        for col in _deposit_columns(extracted_data[key])
+    ]
+    return np.asarray(balances, dtype=np.float64), (np.concatenate(deposits) if deposits else np.empty(0))
+
+
+def summarize(extracted_data, values):
+    """Format kernel values as this profile's summary."""
+    balance_count = len(ending_balances(extracted_data))
+
+    summary = {
+        "Total Count": balance_count if balance_count else "N/A",
+        "Total Balance": "N/A",
+        "Average Balance": "N/A",
+        "Negative Days Count": "N/A",
+        "Average Negative Days (%)": "N/A",
+        "No.of.Deposits": values["deposit_count"],
+        "Total Amount of Deposits": values["deposit_total"],
+    }
+
+    if balance_count:
+        summary["Negative Days Count"] = values["negative_days"]
+        summary["Average Negative Days (%)"] = round(values["negative_day_ratio"] * 100, 2) if values["balance_days"] else 0
+        if values["balance_days"]:
+            summary["Total Balance"] = values["total_balance"]
+            summary["Average Balance"] = values["average_daily_balance"]
+
+    return summary
+
+
+# Function to compute balance and deposit summaries
+@traced("metrics", profile="wellsfargo")
+def metrics(extracted_data):
+    return summarize(extracted_data, statement_metrics(*metric_inputs(extracted_data)))
@@ -0,0 +1,63 @@
+import streamlit as st
+import pandas as pd
+
+# How the status line describes each "Source" of the timing table
+STATUS_SOURCE = {"Azure": "analyzed", "Cache": "from cache", "Duplicate": "duplicate", "Rejected": "rejected"}
+
+
+class ProgressReporter:
+    """Drive `st.progress` and a status line from analysis completion events.
+
+    Pass `on_complete` and `timings` to `analysis.analyze_batch`; the bar then
+    moves as each file actually finishes instead of on a fixed schedule.
+    """
+
+    def __init__(self, file_names, status_placeholder=None, scheduler=None):
+        self.file_names = list(file_names)
+        self.scheduler = scheduler
+        self.total_files = len(self.file_names)
+        self.progress_bar = st.progress(0)
+        self.status_placeholder = status_placeholder or st.empty()
+        self.timings = [{} for _ in self.file_names]
+        self.status_placeholder.text(f"Processing {self.total_files} file(s) ...")
+
+    def on_complete(self, i, result, completed):
+        source = STATUS_SOURCE[self.source(self.timings[i])]
+        status = f"{source.capitalize()}: {self.file_names[i]} ({completed}/{self.total_files})"
+        if self.scheduler is not None:
+            stats = self.scheduler.stats()
+            status += f" · {stats['queue_depth']} queued, {stats['throttled']} throttled"
+        self.status_placeholder.text(status)
+        self.progress_bar.progress(completed / self.total_files if self.total_files else 1.0)
+
+    def record(self, i, stage, seconds):
+        self.timings[i][stage] = seconds
+
+    def finish(self, message="✅ All files processed successfully!"):
+        self.status_placeholder.text(message)
+
+    @staticmethod
+    def source(timing):
+        if timing.get("rejected"):
+            return "Rejected"
+        if timing.get("duplicate"):
+            return "Duplicate"
+        return "Cache" if timing.get("cached") else "Azure"
+
+    def timing_table(self):
+        rows = []
+        for file_name, timing in zip(self.file_names, self.timings):
+            rows.append({
+                "File Name": file_name,
+                "Source": self.source(timing),
+                "Upload (s)": round(timing.get("upload", 0.0), 3),
+                "Service Wait (s)": round(timing.get("service", 0.0), 3),
+                "Polling (s)": round(timing.get("polling", 0.0), 3),
+                "Polls": timing.get("polls") or 0,
+                "Post-processing (s)": round(timing.get("post_processing", 0.0), 3),
+            })
+        return pd.DataFrame(rows)
+
+    def show_timings(self):
+        with st.expander("⏱️ Processing Time Breakdown"):
+            st.dataframe(self.timing_table(), use_container_width=True)
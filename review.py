@@ -0,0 +1,231 @@
+"""Second pass over the fields the model was unsure of.
+
+Fields and table cells whose confidence is at or below the review threshold
+(the `review_confidence` env var, 0.9 by default) are found through their
+bounding regions, and only the pages they sit on are analyzed again with the
+review model (the `review_model_id` env var, prebuilt-layout by default):
+
+- if the review model returns the same field over the same area, as a
+  retrained custom model does, its reading replaces the original when it is
+  more confident;
+- otherwise the words it read inside the field's bounding box become the
+  new value, for string, number and currency fields.
+
+Corrections are written back to the cached result, so the next load of the
+statement sees them and a fix costs a page or two of analysis instead of
+the whole statement.
+"""
+import copy
+import os
+import re
+from analysis import analyze_document, get_scheduler
+from cache import ResultCache, get_api_version
+from preflight import prepare_batch
+from splitting import get_pages_per_chunk, merge_results, split_pdf
+from telemetry import get_telemetry
+
+DEFAULT_CONFIDENCE = 0.9
+DEFAULT_REVIEW_MODEL_ID = "prebuilt-layout"
+
+# Share of a field's bounding box the review reading must cover to count as the same field
+MIN_OVERLAP = 0.5
+
+NUMBER = re.compile(r"^\(?-?\$?-?[\d,]*\.?\d+\)?-?$")
+
+
+def get_review_confidence():
+    """Confidence at or below which a field is reviewed (the `review_confidence` env var)."""
+    return float(os.getenv("review_confidence", DEFAULT_CONFIDENCE))
+
+
+def get_review_model_id():
+    """Model the flagged pages are re-analyzed with (the `review_model_id` env var)."""
+    return os.getenv("review_model_id", DEFAULT_REVIEW_MODEL_ID)
+
+
+def _leaves(container, key, path):
+    """(path, container, key) for every field below `container[key]` that holds a single value."""
+    field = container[key]
+    if field.get("type") == "array":
+        for i in range(len(field.get("valueArray") or [])):
+            yield from _leaves(field["valueArray"], i, path + (i,))
+    elif field.get("type") == "object":
+        for name in field.get("valueObject") or {}:
+            yield from _leaves(field["valueObject"], name, path + (name,))
+    else:
+        yield path, container, key
+
+
+def field_leaves(data):
+    """Every single-value field of the first document in an AnalyzeResult dict."""
+    documents = data.get("documents") or []
+    fields = documents[0].get("fields") or {} if documents else {}
+    for name in fields:
+        yield from _leaves(fields, name, (name,))
+
+
+def field_label(path):
+    """Readable field path, e.g. DailyEndingBalance[3].AMOUNT."""
+    return "".join(f"[{part}]" if isinstance(part, int) else f".{part}" for part in path).lstrip(".")
+
+
+def _region(field):
+    regions = field.get("boundingRegions") or []
+    if not regions or not regions[0].get("polygon"):
+        return None, None
+    polygon = regions[0]["polygon"]
+    return regions[0]["pageNumber"], (min(polygon[0::2]), min(polygon[1::2]), max(polygon[0::2]), max(polygon[1::2]))
+
+
+def _overlap(box, other):
+    """Share of `box` covered by `other`."""
+    width = min(box[2], other[2]) - max(box[0], other[0])
+    height = min(box[3], other[3]) - max(box[1], other[1])
+    area = (box[2] - box[0]) * (box[3] - box[1])
+    return width * height / area if width > 0 and height > 0 and area > 0 else 0.0
+
+
+# Function to list the fields a result is unsure of
+def low_confidence_fields(data, threshold=None):
+    """Return (path, container, key) for each located field at or below `threshold`."""
+    threshold = get_review_confidence() if threshold is None else threshold
+    flagged = []
+    for path, container, key in field_leaves(data):
+        field = container[key]
+        if field.get("confidence") is not None and field["confidence"] <= threshold and _region(field)[0] is not None:
+            flagged.append((path, container, key))
+    return flagged
+
+
+def _same_field(review, path, page, box):
+    """The review model's reading of the field named like `path` over the same area, if any."""
+    best, best_overlap = None, MIN_OVERLAP
+    for other_path, container, key in field_leaves(review):
+        if other_path[-1] != path[-1]:
+            continue
+        other_page, other_box = _region(container[key])
+        overlap = _overlap(box, other_box) if other_page == page else 0.0
+        if overlap >= best_overlap:
+            best, best_overlap = container[key], overlap
+    return best
+
+
+def _words_in(review, page, box):
+    """Text and lowest confidence of the words the review model read inside `box`."""
+    words = []
+    for review_page in review.get("pages") or []:
+        if review_page.get("pageNumber") != page:
+            continue
+        for word in review_page.get("words") or []:
+            polygon = word.get("polygon") or []
+            if not polygon:
+                continue
+            x, y = sum(polygon[0::2]) / len(polygon[0::2]), sum(polygon[1::2]) / len(polygon[1::2])
+            if box[0] <= x <= box[2] and box[1] <= y <= box[3]:
+                words.append(word)
+    if not words:
+        return None, None
+    return " ".join(word["content"] for word in words), min(word.get("confidence", 0.0) for word in words)
+
+
+def _retyped(field, text, confidence):
+    """Copy of `field` holding `text`, or None if its type cannot take the text."""
+    field = {**field, "content": text, "confidence": confidence}
+    if field.get("type") == "string":
+        field["valueString"] = text
+        return field
+    if field.get("type") in ("number", "integer", "currency"):
+        compact = text.replace(" ", "")
+        if not NUMBER.match(compact):
+            return None
+        amount = float(re.sub(r"[^\d.]", "", compact)) * (-1 if "-" in compact or "(" in compact else 1)
+        if field["type"] == "currency":
+            field["valueCurrency"] = {**(field.get("valueCurrency") or {}), "amount": amount}
+        else:
+            field["valueNumber" if field["type"] == "number" else "valueInteger"] = int(amount) if field["type"] == "integer" else amount
+        return field
+    return None
+
+
+# Function to re-analyze the pages of low-confidence fields and merge the better readings back in
+def review_result(client, model_id, file_bytes, result, threshold=None, review_model_id=None, scheduler=None):
+    """Return (reviewed AnalyzeResult, one dict per flagged field).
+
+    Each dict has the field's path, page, value and confidence before and
+    after review, and whether it was corrected. A result with nothing flagged
+    is returned as it is, without any request.
+    """
+    from azure.ai.documentintelligence.models import AnalyzeResult
+
+    data = copy.deepcopy(result.as_dict())
+    flagged = low_confidence_fields(data, threshold)
+    if not flagged:
+        return result, []
+
+    pages = sorted({_region(container[key])[0] for _, container, key in flagged})
+    review_model_id = review_model_id or get_review_model_id()
+    review = (scheduler or get_scheduler()).call(
+        analyze_document, client, review_model_id, file_bytes, pages=",".join(map(str, pages)),
+    ).as_dict()
+
+    reviewed = []
+    for path, container, key in flagged:
+        field = container[key]
+        page, box = _region(field)
+        better = _same_field(review, path, page, box)
+        if better is None:
+            text, confidence = _words_in(review, page, box)
+            better = _retyped(field, text, confidence) if text else None
+        corrected = better is not None and (better.get("confidence") or 0.0) > field["confidence"]
+        if corrected:
+            container[key] = better
+        reviewed.append({
+            "Field": field_label(path),
+            "Page": page,
+            "Before": field.get("content", ""),
+            "Confidence Before": field["confidence"],
+            "After": container[key].get("content", ""),
+            "Confidence After": container[key]["confidence"],
+            "Corrected": corrected,
+        })
+
+    get_telemetry().count("fields_corrected", sum(entry["Corrected"] for entry in reviewed), model=model_id)
+    return AnalyzeResult(data), reviewed
+
+
+# Function to review one statement, updating its cached chunk results
+def review_document(client, model_id, file_bytes, cache=None, threshold=None, review_model_id=None, pages_per_chunk=None, drop_pages=None, irrelevant_pages=None, polling_settings=None):
+    """Review a statement's low-confidence fields and return (result, flagged fields).
+
+    The PDF goes through the same pre-flight and page-range split as
+    `splitting.analyze_batch_split`, so each reviewed chunk replaces exactly
+    the cache entry that analysis reads; chunks not yet cached are analyzed
+    first, with `polling_settings`. Pages in the flagged field dicts are
+    those of the whole statement. Pass `profiles.analysis_settings(profile)`
+    for the profile's `irrelevant_pages` and `polling_settings`.
+    """
+    pages_per_chunk = get_pages_per_chunk() if pages_per_chunk is None else pages_per_chunk
+    (prepared,), (error,) = prepare_batch([file_bytes], irrelevant_pages, drop_pages)
+    if error is not None:
+        raise error
+
+    api_version = get_api_version(client)
+    scheduler = get_scheduler()
+    parts, flagged = [], []
+    for first_page, chunk_bytes in split_pdf(prepared, pages_per_chunk):
+        key = ResultCache.make_key(chunk_bytes, model_id, api_version)
+        result = cache.get(key) if cache is not None else None
+        analyzed = result is None
+        if analyzed:
+            result = scheduler.call(analyze_document, client, model_id, chunk_bytes, polling_settings=polling_settings)
+
+        result, reviewed = review_result(client, model_id, chunk_bytes, result, threshold, review_model_id, scheduler)
+        if cache is not None and (analyzed or any(entry["Corrected"] for entry in reviewed)):
+            cache.put(key, result)
+
+        for entry in reviewed:
+            entry["Page"] += first_page - 1
+        parts.append((first_page, result))
+        flagged.extend(reviewed)
+
+    return merge_results(parts), flagged
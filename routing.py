@@ -0,0 +1,161 @@
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+from analysis import get_max_concurrency, get_scheduler
+from cache import DEFAULT_CACHE_DIR
+from polling import polling_method
+from profiles import PROFILES
+
+# Cheap prebuilt model used to read page 1 when the PDF has no text layer
+READ_MODEL_ID = "prebuilt-read"
+
+
+class RouteCache:
+    """Bank routing decisions keyed by SHA-256 of the PDF, persisted as JSON.
+
+    The file sits in its own subdirectory of the cache directory, out of reach
+    of `ResultCache` eviction and `clear()`, which treat the files at the top
+    as analyze results.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(os.getenv("cache_dir", DEFAULT_CACHE_DIR), "routes", "routes.json")
+        self._lock = threading.Lock()
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self.routes = json.load(f)
+        except (OSError, ValueError):
+            self.routes = {}
+
+    def __contains__(self, digest):
+        return digest in self.routes
+
+    def get(self, digest):
+        return self.routes.get(digest)
+
+    def set(self, digest, bank):
+        with self._lock:
+            self.routes[digest] = bank
+
+    def save(self):
+        """Write the routes, merged with those other processes saved since they were loaded.
+
+        Writers take an exclusive lock on `<path>.lock`, re-read the file and
+        replace it with a uniquely named temporary file, so concurrent workers
+        neither clobber each other's temporary files nor drop each other's routes.
+        """
+        with self._lock:
+            directory = os.path.dirname(self.path) or "."
+            os.makedirs(directory, exist_ok=True)
+            with open(f"{self.path}.lock", "a") as lock_file:
+                _lock_file(lock_file)
+                try:
+                    with open(self.path, encoding="utf-8") as f:
+                        self.routes = {**json.load(f), **self.routes}
+                except (OSError, ValueError):
+                    pass
+                with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=directory, suffix=".tmp", delete=False) as f:
+                    json.dump(self.routes, f)
+                os.replace(f.name, self.path)
+
+
+def _lock_file(f):
+    """Hold an exclusive lock on open file `f` until it is closed (no-op where unsupported)."""
+    try:
+        import fcntl
+    except ImportError:
+        return
+    fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+
+_route_cache = None
+
+
+def get_route_cache():
+    global _route_cache
+    if _route_cache is None:
+        _route_cache = RouteCache()
+    return _route_cache
+
+
+def match_bank(text):
+    """Return the profile whose markers appear most often in `text`, or None."""
+    text = (text or "").lower()
+    scores = {
+        name: sum(text.count(marker.lower()) for marker in entry["markers"])
+        for name, entry in PROFILES.items()
+    }
+    best = max(scores, key=scores.get)
+    return best if scores[best] > 0 else None
+
+
+# Function to read page 1's text layer locally (needs the optional pypdf package)
+def first_page_text(file_bytes):
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        return ""
+
+    try:
+        reader = PdfReader(io.BytesIO(file_bytes))
+        if not reader.pages:
+            return ""
+        return reader.pages[0].extract_text() or ""
+    except Exception:
+        return ""
+
+
+# Function to OCR page 1 with the prebuilt read model
+def read_first_page(client, file_bytes):
+    polling = polling_method(client, READ_MODEL_ID, 1)
+    poller = client.begin_analyze_document(
+        model_id=READ_MODEL_ID, body=file_bytes, content_type="application/pdf", pages="1",
+        **({"polling": polling} if polling is not None else {}),
+    )
+    return poller.result().content or ""
+
+
+# Function to decide which bank profile a statement belongs to
+def detect_bank(file_bytes, client=None, route_cache=None):
+    """Detect the bank from the first page, before any custom-model call.
+
+    The local text layer is tried first; scanned PDFs without one fall back to
+    the prebuilt read model on page 1 when a `client` is given. Decisions,
+    including "unknown" (None), are remembered per file hash in `route_cache`.
+    """
+    digest = hashlib.sha256(file_bytes).hexdigest()
+    if route_cache is not None and digest in route_cache:
+        return route_cache.get(digest)
+
+    bank = match_bank(first_page_text(file_bytes))
+    if bank is None and client is not None:
+        bank = match_bank(get_scheduler().call(read_first_page, client, file_bytes))
+
+    if route_cache is not None:
+        route_cache.set(digest, bank)
+    return bank
+
+
+# Function to detect the bank for a batch of PDFs concurrently
+def route_batch(files, client=None, route_cache=None, max_concurrency=None):
+    """Return the detected profile name (or None) for each PDF, in order.
+
+    A file whose classification call fails is reported as None and not cached,
+    so it is classified again on the next run.
+    """
+    def detect(file_bytes):
+        try:
+            return detect_bank(file_bytes, client, route_cache)
+        except Exception:
+            return None
+
+    with ThreadPoolExecutor(max_workers=max_concurrency or get_max_concurrency()) as executor:
+        banks = list(executor.map(detect, files))
+
+    if route_cache is not None:
+        route_cache.save()
+    return banks
@@ -0,0 +1,258 @@
+from collections import defaultdict
+import io
+import os
+import re
+import pandas as pd
+from analysis import analyze_batch, analyze_document, get_scheduler
+from preflight import prepare_batch
+from profiles import analysis_settings
+from telemetry import get_telemetry
+
+# Default pages per chunk; 0 analyzes every statement in one request
+DEFAULT_PAGES_PER_CHUNK = 0
+
+# Fields the models emit once per page, e.g. TranscationHistory_page2
+PAGE_FIELD = re.compile(r"^(.*_page)(\d+)$")
+
+
+def get_pages_per_chunk():
+    """Read the chunk size from the `pages_per_chunk` env var; 0 disables splitting."""
+    return max(0, int(os.getenv("pages_per_chunk", DEFAULT_PAGES_PER_CHUNK)))
+
+
+# Function to split a PDF into page ranges (needs the optional pypdf package)
+def split_pdf(file_bytes, pages_per_chunk):
+    """Return a list of (first page, PDF bytes) chunks of at most `pages_per_chunk` pages.
+
+    Short PDFs, unreadable PDFs and a missing pypdf all yield the original
+    bytes as a single chunk, so the statement is still analyzed in one request.
+    """
+    if pages_per_chunk <= 0:
+        return [(1, file_bytes)]
+
+    try:
+        from pypdf import PdfReader, PdfWriter
+    except ImportError:
+        return [(1, file_bytes)]
+
+    try:
+        reader = PdfReader(io.BytesIO(file_bytes))
+        page_count = len(reader.pages)
+        if page_count <= pages_per_chunk:
+            return [(1, file_bytes)]
+
+        chunks = []
+        for start in range(0, page_count, pages_per_chunk):
+            writer = PdfWriter()
+            for page in reader.pages[start:start + pages_per_chunk]:
+                writer.add_page(page)
+            output = io.BytesIO()
+            writer.write(output)
+            chunks.append((start + 1, output.getvalue()))
+        return chunks
+    except Exception:
+        return [(1, file_bytes)]
+
+
+def _shift(value, page_offset, content_offset):
+    """Move page numbers and content spans of a chunk's JSON into whole-document terms."""
+    if isinstance(value, list):
+        return [_shift(item, page_offset, content_offset) for item in value]
+    if not isinstance(value, dict):
+        return value
+
+    shifted = {}
+    for key, item in value.items():
+        if key == "pageNumber" and isinstance(item, int):
+            shifted[key] = item + page_offset
+        elif key == "spans" and isinstance(item, list):
+            shifted[key] = [{**span, "offset": span.get("offset", 0) + content_offset} for span in item]
+        else:
+            shifted[key] = _shift(item, page_offset, content_offset)
+    return shifted
+
+
+def _merge_fields(merged, fields, page_offset):
+    for name, field in fields.items():
+        match = PAGE_FIELD.match(name)
+        if match:
+            # Per-page fields are renumbered to their page in the whole statement
+            name = f"{match.group(1)}{int(match.group(2)) + page_offset}"
+
+        if name not in merged:
+            merged[name] = field
+        elif field.get("type") == "array":
+            merged[name] = {**merged[name], "valueArray": (merged[name].get("valueArray") or []) + (field.get("valueArray") or [])}
+        elif not any(key.startswith("value") for key in merged[name]):
+            # Header values come from the first chunk that actually found them
+            merged[name] = field
+
+
+# Function to combine chunk results into one result for the whole statement
+def merge_results(parts):
+    """Merge `(first page, AnalyzeResult)` pairs, in page order, into one AnalyzeResult.
+
+    Tables (array fields) are concatenated in page order, per-page fields such
+    as `TranscationHistory_page1` are renumbered to the statement's page
+    numbers, and single values keep the first chunk's reading. Page numbers and
+    content spans are shifted so bounding regions still point at the right page.
+    """
+    if len(parts) == 1:
+        return parts[0][1]
+
+    from azure.ai.documentintelligence.models import AnalyzeResult
+
+    merged = None
+    content = []
+    content_offset = 0
+    for first_page, result in parts:
+        data = _shift(result.as_dict(), first_page - 1, content_offset)
+        content.append(data.get("content") or "")
+        content_offset += len(content[-1]) + 1  # Chunks are joined with a newline
+
+        if merged is None:
+            merged = {**data, "pages": [], "documents": []}
+        merged["pages"].extend(data.get("pages") or [])
+
+        for i, doc in enumerate(data.get("documents") or []):
+            if i == len(merged["documents"]):
+                merged["documents"].append({**doc, "fields": {}, "boundingRegions": [], "spans": []})
+            target = merged["documents"][i]
+            target["boundingRegions"].extend(doc.get("boundingRegions") or [])
+            target["spans"].extend(doc.get("spans") or [])
+            target["confidence"] = min(target.get("confidence", 1.0), doc.get("confidence", 1.0))
+            _merge_fields(target["fields"], doc.get("fields") or {}, first_page - 1)
+
+    merged["content"] = "\n".join(content)
+    return AnalyzeResult(merged)
+
+
+# Function to analyze many PDFs, fanning long ones out as page-range chunks
+def analyze_batch_split(client, model_id, files, pages_per_chunk=None, max_concurrency=None, on_complete=None, return_exceptions=False, cache=None, timings=None, scheduler=None, keep_results=True, drop_pages=None, report=None, irrelevant_pages=None, polling_settings=None):
+    """Same contract as `analysis.analyze_batch`, but splits long statements.
+
+    Each PDF longer than `pages_per_chunk` pages is cut into page ranges, and
+    the chunks of every file share one pool of in-flight requests. A file
+    completes once all its chunks have, and its chunk results are merged with
+    `merge_results`; any failed chunk fails the whole file. Chunks are cached
+    individually. A file's timing adds up its chunks' upload times and takes
+    the slowest chunk's service and polling times.
+
+    Files first go through `preflight.prepare_batch`: invalid, encrypted and
+    empty PDFs complete at once with a `PreflightError`, and with `drop_pages`
+    (default: the `drop_pages` env var) pages headed by one of
+    `irrelevant_pages` are removed before upload. `report`, if given, is
+    filled with the pre-flight totals. `profiles.analysis_settings(profile)`
+    gives `irrelevant_pages` and `polling_settings` for a bank profile.
+    """
+    pages_per_chunk = get_pages_per_chunk() if pages_per_chunk is None else pages_per_chunk
+    report = {} if report is None else report
+    files, rejections = prepare_batch(files, irrelevant_pages, drop_pages, report)
+    get_telemetry().count("bytes_saved", report["bytes_saved"], model=model_id)
+
+    chunks = []  # (file index, first page, PDF bytes)
+    file_chunks = defaultdict(list)
+    results = [None] * len(files)
+    completed = 0
+    for i, file_bytes in enumerate(files):
+        if rejections[i] is not None:
+            if not return_exceptions:
+                raise rejections[i]
+            if timings is not None:
+                timings[i].update(upload=0.0, service=0.0, polling=0.0, cached=False, rejected=True)
+            completed += 1
+            results[i] = rejections[i]
+            if on_complete:
+                on_complete(i, rejections[i], completed)
+            continue
+        for first_page, chunk_bytes in split_pdf(file_bytes, pages_per_chunk):
+            file_chunks[i].append(len(chunks))
+            chunks.append((i, first_page, chunk_bytes))
+
+    chunk_results = [None] * len(chunks)
+    chunk_timings = [{} for _ in chunks] if timings is not None else None
+    remaining = {i: len(indexes) for i, indexes in file_chunks.items()}
+
+    def chunk_done(c, result, _):
+        nonlocal completed
+        i = chunks[c][0]
+        chunk_results[c] = result
+        remaining[i] -= 1
+        if remaining[i]:
+            return
+
+        parts = [(chunks[k][1], chunk_results[k]) for k in file_chunks[i]]
+        errors = [result for _, result in parts if isinstance(result, Exception)]
+        try:
+            results[i] = errors[0] if errors else merge_results(parts)
+        except Exception as e:
+            if not return_exceptions:
+                raise
+            results[i] = e
+
+        if timings is not None:
+            parts_timing = [chunk_timings[k] for k in file_chunks[i]]
+            timings[i].update(
+                upload=sum(t.get("upload", 0.0) for t in parts_timing),
+                service=max(t.get("service", 0.0) for t in parts_timing),
+                polling=max(t.get("polling", 0.0) for t in parts_timing),
+                polls=sum(t.get("polls") or 0 for t in parts_timing),
+                cached=all(t.get("cached") for t in parts_timing),
+                duplicate=all(t.get("duplicate") for t in parts_timing),
+                chunks=len(parts_timing),
+            )
+
+        # The merged result replaces the chunks; drop them to free memory early
+        for k in file_chunks[i]:
+            chunk_results[k] = None
+
+        completed += 1
+        if on_complete:
+            on_complete(i, results[i], completed)
+        if not (keep_results or isinstance(results[i], Exception)):
+            results[i] = None
+
+    analyze_batch(
+        client, model_id, [chunk_bytes for _, _, chunk_bytes in chunks], max_concurrency=max_concurrency,
+        on_complete=chunk_done, return_exceptions=return_exceptions, cache=cache, timings=chunk_timings,
+        scheduler=scheduler, keep_results=False, polling_settings=polling_settings,
+    )
+    return results
+
+
+def _same(left, right):
+    if isinstance(left, pd.DataFrame) and isinstance(right, pd.DataFrame):
+        return left.reset_index(drop=True).equals(right.reset_index(drop=True))
+    return left == right
+
+
+# Function to check a split analysis against a single request for the same PDF
+def compare_split(client, model_id, file_bytes, profile, pages_per_chunk=None):
+    """Analyze `file_bytes` both whole and split, and list where the two disagree.
+
+    Both results go through `profile.extract` and `profile.metrics`; an empty
+    list means every field, table and summary value matched. Costs two full
+    analyses, so use it to validate a chunk size rather than in production.
+    """
+    settings = analysis_settings(profile)
+    single = get_scheduler().call(analyze_document, client, model_id, file_bytes, polling_settings=settings["polling_settings"])
+    split = analyze_batch_split(client, model_id, [file_bytes], pages_per_chunk=pages_per_chunk, **settings)[0]
+
+    expected = profile.extract(single)
+    actual = profile.extract(split)
+    if expected is None or actual is None:
+        return [] if expected is None and actual is None else ["only one analysis found a document"]
+
+    differences = []
+    for key in dict.fromkeys(list(expected) + list(actual)):
+        if key not in actual or key not in expected:
+            differences.append(f"{key}: only in the {'single' if key in expected else 'split'} analysis")
+        elif not _same(expected[key], actual[key]):
+            differences.append(f"{key}: values differ")
+
+    expected_summary = profile.metrics(expected)
+    actual_summary = profile.metrics(actual)
+    for key in expected_summary:
+        if expected_summary[key] != actual_summary.get(key):
+            differences.append(f"{key}: {expected_summary[key]} != {actual_summary.get(key)}")
+    return differences
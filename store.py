@@ -0,0 +1,276 @@
+"""Local SQLite store of extracted statements for cross-statement queries.
+
+Each analyzed statement is appended once, keyed by bank and file hash, with
+its summary, its tables and the daily balances and deposits that
+`metrics_kernel` works from. Deposits a profile cannot report are stored as
+NULL and left out of the totals, rather than counted as zero. Statements are
+indexed by bank, account and statement period, so figures across months are
+a local query:
+
+    python store.py --bank wellsfargo --account 123 --since 2024-01-01
+"""
+import argparse
+from io import StringIO
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+import numpy as np
+import pandas as pd
+from fields import NO_YEAR, display_frame
+from metrics_kernel import statement_metrics
+
+# Default database file, overridable with the store_path env var
+DEFAULT_STORE_PATH = ".data/statements.sqlite3"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS statements (
+    id INTEGER PRIMARY KEY,
+    bank TEXT NOT NULL,
+    account TEXT,
+    period_start TEXT,
+    period_end TEXT,
+    file_name TEXT NOT NULL,
+    file_sha256 TEXT NOT NULL,
+    stored_at REAL NOT NULL,
+    summary TEXT NOT NULL,
+    balance_days INTEGER NOT NULL,
+    balance_total_cents INTEGER NOT NULL,
+    negative_days INTEGER NOT NULL,
+    deposit_count INTEGER,
+    deposit_total_cents INTEGER,
+    UNIQUE (bank, file_sha256)
+);
+CREATE INDEX IF NOT EXISTS statements_account ON statements (bank, account, period_end);
+CREATE TABLE IF NOT EXISTS balances (
+    statement_id INTEGER NOT NULL REFERENCES statements (id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    balance_cents INTEGER NOT NULL,
+    PRIMARY KEY (statement_id, seq)
+);
+CREATE TABLE IF NOT EXISTS tables (
+    statement_id INTEGER NOT NULL REFERENCES statements (id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (statement_id, name)
+);
+"""
+
+ACCOUNT_FIELD = re.compile(r"account", re.IGNORECASE)
+PERIOD_FIELD = re.compile(r"period", re.IGNORECASE)
+START_FIELD = re.compile(r"(start|begin|from|opening).*date|date.*(start|begin|from)", re.IGNORECASE)
+END_FIELD = re.compile(r"(end|through|to|closing).*date|date.*(end|through|to)|statement.?date", re.IGNORECASE)
+PERIOD_SEPARATOR = re.compile(r"\s+(?:-|–|to|through|thru)\s+", re.IGNORECASE)
+
+
+def _date(text):
+    date = pd.to_datetime(str(text).strip(), errors="coerce")
+    return None if pd.isna(date) else date.date().isoformat()
+
+
+def statement_account(extracted_data):
+    """The account number (or name) the model read, preferring a field named like a number."""
+    candidates = [
+        (name, value) for name, value in extracted_data.items()
+        if isinstance(value, str) and value != "N/A" and ACCOUNT_FIELD.search(name)
+    ]
+    candidates.sort(key=lambda item: not re.search(r"number|no\b|num", item[0], re.IGNORECASE))
+    return candidates[0][1].strip() if candidates else None
+
+
+def statement_period(extracted_data):
+    """(start, end) ISO dates from the statement's period fields, else from its dated table rows."""
+    start = end = None
+    for name, value in extracted_data.items():
+        if not isinstance(value, str) or value == "N/A":
+            continue
+        if PERIOD_FIELD.search(name):
+            parts = PERIOD_SEPARATOR.split(value.strip(), maxsplit=1)
+            if len(parts) == 2:
+                start, end = start or _date(parts[0]), end or _date(parts[1])
+        elif START_FIELD.search(name):
+            start = start or _date(value)
+        elif END_FIELD.search(name):
+            end = end or _date(value)
+    if start and end:
+        return start, end
+
+    # Table dates carry a year only when the statement printed one
+    dates = [
+        data[col].dropna() for data in extracted_data.values() if isinstance(data, pd.DataFrame)
+        for col in data.columns if pd.api.types.is_datetime64_any_dtype(data[col])
+    ]
+    dates = pd.concat(dates) if dates else pd.Series([], dtype="datetime64[ns]")
+    dates = dates[dates.dt.year != NO_YEAR]
+    if not dates.empty:
+        start, end = start or dates.min().date().isoformat(), end or dates.max().date().isoformat()
+    return start, end
+
+
+def _cents(amounts):
+    amounts = np.asarray(amounts, dtype=np.float64)
+    return np.round(amounts[~np.isnan(amounts)] * 100).astype(np.int64)
+
+
+class StatementStore:
+    """SQLite database of statements, their tables and daily balances.
+
+    One connection is shared between threads behind a lock. The figures
+    stored per statement follow `metrics_kernel`'s definitions, so totals
+    across statements agree with the per-statement summaries.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.getenv("store_path", DEFAULT_STORE_PATH)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+
+    def add(self, bank, profile, file_name, file_sha256, extracted_data, summary):
+        """Store one statement, replacing an earlier copy of the same file; returns its id."""
+        if hasattr(profile, "metric_inputs"):
+            balances, deposits = profile.metric_inputs(extracted_data)
+        else:
+            balances, deposits = np.empty(0), None
+        values = statement_metrics(balances, deposits)
+        deposit_count, deposit_total_cents = values["deposit_count"], int(round(values["deposit_total"] * 100))
+        if deposits is None:
+            # Profiles without deposit entries may still report the statement's printed figures
+            printed = profile.statement_deposits(extracted_data) if hasattr(profile, "statement_deposits") else None
+            deposit_count, deposit_total_cents = (None, None) if printed is None else (printed[0], int(round(printed[1] * 100)))
+        account = statement_account(extracted_data)
+        period_start, period_end = statement_period(extracted_data)
+
+        tables = [
+            (name, display_frame(data).to_json(orient="split", date_format="iso", index=False))
+            for name, data in extracted_data.items() if isinstance(data, pd.DataFrame)
+        ]
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM statements WHERE bank = ? AND file_sha256 = ?", (bank, file_sha256))
+            statement_id = self.conn.execute(
+                "INSERT INTO statements (bank, account, period_start, period_end, file_name, file_sha256, stored_at, summary,"
+                " balance_days, balance_total_cents, negative_days, deposit_count, deposit_total_cents)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    bank, account, period_start, period_end, file_name, file_sha256, time.time(),
+                    json.dumps(summary, default=lambda value: value.item() if isinstance(value, np.generic) else str(value)),
+                    values["balance_days"], int(round(values["total_balance"] * 100)), values["negative_days"],
+                    deposit_count, deposit_total_cents,
+                ),
+            ).lastrowid
+            self.conn.executemany(
+                "INSERT INTO balances (statement_id, seq, balance_cents) VALUES (?, ?, ?)",
+                ((statement_id, seq, int(cents)) for seq, cents in enumerate(_cents(balances))),
+            )
+            self.conn.executemany(
+                "INSERT INTO tables (statement_id, name, data) VALUES (?, ?, ?)",
+                ((statement_id, name, data) for name, data in tables),
+            )
+        return statement_id
+
+    def _where(self, bank=None, account=None, since=None, until=None):
+        clauses, params = [], []
+        for clause, value in (("bank = ?", bank), ("account = ?", account), ("period_end >= ?", since), ("period_start <= ?", until)):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def statements(self, bank=None, account=None, since=None, until=None):
+        """Stored statements matching the filters, newest period first."""
+        where, params = self._where(bank, account, since, until)
+        with self._lock:
+            return pd.read_sql_query(
+                "SELECT id, bank, account, period_start, period_end, file_name, summary FROM statements"
+                f"{where} ORDER BY period_end DESC, id DESC", self.conn, params=params,
+            )
+
+    def metrics(self, bank=None, account=None, since=None, until=None):
+        """Balance and deposit figures across every matching statement.
+
+        `since`/`until` are ISO dates compared with the statement periods.
+        Deposit figures cover the `deposit_statements` whose deposits are
+        known, and are None when none are.
+        """
+        where, params = self._where(bank, account, since, until)
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT COUNT(*), MIN(period_start), MAX(period_end), SUM(balance_days), SUM(balance_total_cents),"
+                f" SUM(negative_days), COUNT(deposit_count), SUM(deposit_count), SUM(deposit_total_cents) FROM statements{where}",
+                params,
+            ).fetchone()
+        count, start, end, days, total, negative, deposit_statements, deposit_count, deposit_total = row
+        days = days or 0
+        return {
+            "statements": count,
+            "period_start": start,
+            "period_end": end,
+            "balance_days": days,
+            "average_daily_balance": total / days / 100 if days else None,
+            "negative_days": negative or 0,
+            "negative_day_ratio": negative / days if days else None,
+            "deposit_statements": deposit_statements,
+            "deposit_count": deposit_count,
+            "deposit_total": None if deposit_total is None else deposit_total / 100,
+        }
+
+    def accounts(self):
+        """Per bank and account: statements stored and the same figures as `metrics`."""
+        with self._lock:
+            return pd.read_sql_query(
+                "SELECT bank, account, COUNT(*) AS statements, MIN(period_start) AS period_start, MAX(period_end) AS period_end,"
+                " SUM(balance_days) AS balance_days,"
+                " ROUND(SUM(balance_total_cents) / 100.0 / NULLIF(SUM(balance_days), 0), 2) AS average_daily_balance,"
+                " SUM(negative_days) AS negative_days, COUNT(deposit_count) AS deposit_statements, SUM(deposit_count) AS deposit_count,"
+                " SUM(deposit_total_cents) / 100.0 AS deposit_total"
+                " FROM statements GROUP BY bank, account ORDER BY bank, account",
+                self.conn,
+            )
+
+    def table(self, statement_id, name):
+        """One stored table as a DataFrame, with amounts in dollars."""
+        with self._lock:
+            row = self.conn.execute("SELECT data FROM tables WHERE statement_id = ? AND name = ?", (statement_id, name)).fetchone()
+        return None if row is None else pd.read_json(StringIO(row[0]), orient="split")
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_statement_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = StatementStore()
+        return _store
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query statements stored by the dashboard and cli.py.")
+    parser.add_argument("--bank", help="profile name, e.g. chase")
+    parser.add_argument("--account", help="account as read from the statement")
+    parser.add_argument("--since", help="ISO date; statements whose period ends on or after it")
+    parser.add_argument("--until", help="ISO date; statements whose period starts on or before it")
+    parser.add_argument("--list", action="store_true", help="list matching statements instead of totals")
+    parser.add_argument("--path", help="database file (default: store_path env var)")
+    args = parser.parse_args(argv)
+
+    store = StatementStore(args.path)
+    if args.list:
+        print(store.statements(args.bank, args.account, args.since, args.until).to_string(index=False))
+    elif args.bank or args.account or args.since or args.until:
+        print(json.dumps(store.metrics(args.bank, args.account, args.since, args.until), indent=2))
+    else:
+        print(store.accounts().to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
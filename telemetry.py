@@ -0,0 +1,218 @@
+"""Timing spans and counters for every stage of the extraction pipeline.
+
+Stages are recorded as spans: upload, service and polling for each analyze
+call, then extract and metrics in the bank profiles and field_to_frame for
+each table. Counters track pages processed, bytes uploaded, retries,
+throttled responses and cache hits. Both are exposed two ways:
+
+- a Prometheus text endpoint at http://127.0.0.1:<metrics_port>/metrics,
+  started when the `metrics_port` env var (or cli.py --metrics-port) is set;
+- a JSON trace log with one line per span, appended to the `trace_log` env
+  var path (or cli.py --trace-log).
+
+Span durations are kept as histograms, so a scrape gives counts, sums and
+latency buckets per stage and label.
+"""
+import bisect
+from contextlib import contextmanager
+import functools
+import json
+import os
+import threading
+import time
+
+# Metric names are prefixed with this namespace
+NAMESPACE = "statements"
+
+# Histogram bucket upper bounds, in seconds
+BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120]
+
+COUNTER_HELP = {
+    "pages_processed": "Pages returned by analyze calls",
+    "bytes_uploaded": "PDF bytes sent to analyze calls",
+    "polls": "Status polls of analyze operations",
+    "retries": "Analyze calls retried after a 429/503",
+    "throttled": "429/503 responses seen, including SDK retries",
+    "cache_hits": "Analyze results served from the result cache",
+    "cache_misses": "Result cache lookups that went to Azure",
+    "fields_corrected": "Low-confidence fields replaced by a review pass",
+    "bytes_saved": "PDF bytes not uploaded thanks to pre-flight checks, page dropping and duplicates",
+}
+
+
+def _labels(labels):
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+class Telemetry:
+    """Process-wide span histograms, counters and gauges.
+
+    Recording is a dict update under a lock, cheap enough to leave on.
+    Gauges are read from collectors, callables returning {name: value},
+    when the metrics are rendered.
+    """
+
+    def __init__(self, trace_path=None):
+        self._lock = threading.Lock()
+        self._spans = {}
+        self._counters = {}
+        self._collectors = []
+        self._trace = None
+        self.server = None
+        self.set_trace_log(trace_path or os.getenv("trace_log"))
+
+    def set_trace_log(self, path):
+        """Append span records to `path` as JSON lines; None stops tracing."""
+        with self._lock:
+            if self._trace is not None:
+                self._trace.close()
+            self._trace = None
+            if path:
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                self._trace = open(path, "a", encoding="utf-8", buffering=1)
+
+    def record(self, stage, seconds, **labels):
+        """Add one `stage` span of `seconds` to its histogram and the trace log."""
+        key = (stage, _labels(labels))
+        with self._lock:
+            histogram = self._spans.get(key)
+            if histogram is None:
+                histogram = self._spans[key] = [[0] * len(BUCKETS), 0, 0.0]
+            bucket = bisect.bisect_left(BUCKETS, seconds)
+            if bucket < len(BUCKETS):
+                histogram[0][bucket] += 1
+            histogram[1] += 1
+            histogram[2] += seconds
+            if self._trace is not None:
+                self._trace.write(json.dumps({"time": time.time(), "span": stage, "seconds": round(seconds, 6), **labels}) + "\n")
+
+    @contextmanager
+    def span(self, stage, **labels):
+        """Time the enclosed block as a `stage` span, including when it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start, **labels)
+
+    def count(self, name, value=1, **labels):
+        key = (name, _labels(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def add_collector(self, collector):
+        """Report the {name: value} gauges `collector()` returns on every render."""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def snapshot(self):
+        """Counters and per-stage span totals as plain dicts."""
+        with self._lock:
+            counters = {}
+            for (name, _), value in self._counters.items():
+                counters[name] = counters.get(name, 0) + value
+            spans = {}
+            for (stage, _), (_, count, total) in self._spans.items():
+                entry = spans.setdefault(stage, {"count": 0, "seconds": 0.0})
+                entry["count"] += count
+                entry["seconds"] += total
+        return {"counters": counters, "spans": spans}
+
+    def render(self):
+        """The metrics in the Prometheus text exposition format."""
+        with self._lock:
+            spans = {key: ([*buckets], count, total) for key, (buckets, count, total) in self._spans.items()}
+            counters = dict(self._counters)
+            collectors = list(self._collectors)
+
+        lines = []
+        name = f"{NAMESPACE}_stage_seconds"
+        lines += [f"# HELP {name} Time spent per pipeline stage", f"# TYPE {name} histogram"]
+        for (stage, labels), (buckets, count, total) in sorted(spans.items()):
+            labels = (("stage", stage),) + labels
+            cumulative = 0
+            for bound, bucket_count in zip(BUCKETS, buckets):
+                cumulative += bucket_count
+                lines.append(f"{name}_bucket{_format_labels(labels, [('le', str(bound))])} {cumulative}")
+            lines.append(f"{name}_bucket{_format_labels(labels, [('le', '+Inf')])} {count}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {total}")
+            lines.append(f"{name}_count{_format_labels(labels)} {count}")
+
+        for counter in sorted({counter for counter, _ in counters} | set(COUNTER_HELP)):
+            name = f"{NAMESPACE}_{counter}_total"
+            lines += [f"# HELP {name} {COUNTER_HELP.get(counter, counter)}", f"# TYPE {name} counter"]
+            values = [(labels, value) for (key, labels), value in counters.items() if key == counter] or [((), 0)]
+            lines += [f"{name}{_format_labels(labels)} {value}" for labels, value in sorted(values)]
+
+        for collector in collectors:
+            for gauge, value in collector().items():
+                lines += [f"# TYPE {NAMESPACE}_{gauge} gauge", f"{NAMESPACE}_{gauge} {value}"]
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port, host="127.0.0.1"):
+        """Serve `render()` at /metrics from a background thread; safe to call again."""
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        with self._lock:
+            if self.server is not None:
+                return self.server
+            telemetry = self
+
+            class Handler(BaseHTTPRequestHandler):
+                def log_message(self, *args):
+                    pass
+
+                def do_GET(self):
+                    if self.path.split("?")[0] != "/metrics":
+                        self.send_error(404)
+                        return
+                    body = telemetry.render().encode()
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+            self.server = ThreadingHTTPServer((host, int(port)), Handler)
+            self.server.daemon_threads = True
+            threading.Thread(target=self.server.serve_forever, daemon=True).start()
+            return self.server
+
+
+_telemetry = None
+_telemetry_lock = threading.Lock()
+
+
+# Function to get the telemetry shared by the whole process
+def get_telemetry():
+    """Return the process-wide `Telemetry`, serving metrics if `metrics_port` is set.
+
+    Streamlit imports this module once per server process, so the endpoint
+    is started once and its totals span every rerun and session.
+    """
+    global _telemetry
+    with _telemetry_lock:
+        if _telemetry is None:
+            _telemetry = Telemetry()
+            if os.getenv("metrics_port"):
+                _telemetry.serve(os.getenv("metrics_port"))
+        return _telemetry
+
+
+def traced(stage, **labels):
+    """Decorator recording each call of the function as a `stage` span with `labels`."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with get_telemetry().span(stage, **labels):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
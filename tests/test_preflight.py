@@ -0,0 +1,40 @@
+import io
+import pytest
+from pypdf import PdfReader, PdfWriter
+from preflight import PreflightError, prepare_batch
+
+
+def encrypted_pdf(user_password, owner_password):
+    writer = PdfWriter()
+    writer.add_blank_page(width=612, height=792)
+    writer.encrypt(user_password=user_password, owner_password=owner_password, algorithm="RC4-128")
+    output = io.BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+
+def test_owner_password_only_pdf_is_accepted():
+    pdf = encrypted_pdf("", "owner")
+    (prepared,), (error,) = prepare_batch([pdf], drop_pages=False)
+    assert error is None
+    assert prepared == pdf
+    assert len(PdfReader(io.BytesIO(prepared)).pages) == 1
+
+
+def test_user_password_pdf_is_rejected():
+    (_,), (error,) = prepare_batch([encrypted_pdf("secret", "owner")], drop_pages=False)
+    assert isinstance(error, PreflightError)
+    assert "Encrypted" in str(error)
+
+
+def test_non_pdf_is_rejected():
+    report = {}
+    (_,), (error,) = prepare_batch([b"not a pdf"], report=report)
+    assert isinstance(error, PreflightError)
+    assert report["rejected"] == 1
+
+
+@pytest.mark.parametrize("drop_pages", [False, True])
+def test_owner_password_only_pdf_with_page_dropping(drop_pages):
+    (_,), (error,) = prepare_batch([encrypted_pdf("", "owner")], irrelevant_pages=[r"check images"], drop_pages=drop_pages)
+    assert error is None
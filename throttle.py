@@ -0,0 +1,185 @@
+from email.utils import parsedate_to_datetime
+import random
+import threading
+import time
+from azure.core.exceptions import HttpResponseError
+from azure.core.pipeline.policies import SansIOHTTPPolicy
+from telemetry import get_telemetry
+
+# Default analyze submissions per second (the S0 tier allows 15)
+DEFAULT_MAX_TPS = 15
+
+# Attempts after the first for a throttled or unavailable request
+DEFAULT_MAX_RETRIES = 5
+
+# Status codes that mean "slow down and try again"
+RETRY_STATUS = {429, 503}
+
+# Backoff bounds for retries without a Retry-After header, in seconds
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 60.0
+
+
+def retry_after_seconds(headers):
+    """Seconds to wait from Retry-After style headers, or None if absent."""
+    for name, scale in (("retry-after-ms", 0.001), ("x-ms-retry-after-ms", 0.001), ("retry-after", 1.0)):
+        value = headers.get(name)
+        if value is None:
+            continue
+        try:
+            return max(0.0, float(value) * scale)
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+            except (TypeError, ValueError):
+                continue
+    return None
+
+
+class TokenBucket:
+    """Allow `rate` acquisitions per second on average, with bursts up to `capacity`."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class ThrottleObserverPolicy(SansIOHTTPPolicy):
+    """Pipeline policy reporting every 429/503 response, including SDK retries, to a scheduler."""
+
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
+
+    def on_response(self, request, response):
+        http_response = response.http_response
+        if http_response.status_code in RETRY_STATUS:
+            self.scheduler.record_throttle(retry_after_seconds(http_response.headers))
+
+
+class RequestScheduler:
+    """Pace Azure requests under a TPS budget and an adaptive concurrency limit.
+
+    Each `call` waits for a concurrency slot and a token from a `TokenBucket`
+    refilled at `max_tps`. The concurrency limit starts at `max_concurrency`,
+    is halved when the service throttles (at most once per second), and grows
+    back by one after each limit's worth of successful calls, so it settles
+    near the highest rate the quota allows. A Retry-After pauses every caller,
+    and throttled calls are retried with jittered exponential backoff.
+    Add `policy` to the client's `per_retry_policies` so throttles answered by
+    the SDK's own retries are seen too.
+    """
+
+    def __init__(self, max_concurrency, max_tps=DEFAULT_MAX_TPS, max_retries=DEFAULT_MAX_RETRIES):
+        self.max_concurrency = max_concurrency
+        self.limit = max_concurrency
+        self.bucket = TokenBucket(max_tps)
+        self.max_retries = max_retries
+        self.policy = ThrottleObserverPolicy(self)
+
+        self._cond = threading.Condition()
+        self.in_flight = 0
+        self.waiting = 0
+        self.throttled = 0
+        self.retries = 0
+        self._successes = 0
+        self._last_decrease = 0.0
+        self._resume_at = 0.0
+
+    def configure(self, max_concurrency=None, max_tps=None):
+        with self._cond:
+            if max_concurrency:
+                self.max_concurrency = self.limit = max_concurrency
+            if max_tps:
+                self.bucket = TokenBucket(max_tps)
+            self._cond.notify_all()
+
+    def record_throttle(self, retry_after=None):
+        get_telemetry().count("throttled")
+        with self._cond:
+            self.throttled += 1
+            self._successes = 0
+            now = time.monotonic()
+            if retry_after:
+                self._resume_at = max(self._resume_at, now + retry_after)
+            if now - self._last_decrease >= 1.0:
+                self.limit = max(1, self.limit // 2)
+                self._last_decrease = now
+
+    def _record_success(self):
+        with self._cond:
+            self._successes += 1
+            if self._successes >= self.limit and self.limit < self.max_concurrency:
+                self.limit += 1
+                self._successes = 0
+                self._cond.notify_all()
+
+    def _acquire(self):
+        with self._cond:
+            self.waiting += 1
+            while self.in_flight >= self.limit:
+                self._cond.wait()
+            self.waiting -= 1
+            self.in_flight += 1
+            pause = self._resume_at - time.monotonic()
+        if pause > 0:
+            time.sleep(pause)
+        self.bucket.acquire()
+
+    def _release(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def backoff(self, attempt, retry_after=None):
+        """Full-jitter exponential delay, never shorter than the service's Retry-After."""
+        delay = random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+        return max(delay, retry_after or 0.0)
+
+    def call(self, fn, *args, **kwargs):
+        """Run `fn` under the limits, retrying it on 429/503 up to `max_retries` times."""
+        attempt = 0
+        while True:
+            self._acquire()
+            try:
+                result = fn(*args, **kwargs)
+            except HttpResponseError as e:
+                if e.status_code not in RETRY_STATUS or attempt >= self.max_retries:
+                    raise
+                retry_after = retry_after_seconds(e.response.headers) if e.response is not None else None
+            else:
+                self._record_success()
+                return result
+            finally:
+                self._release()
+
+            with self._cond:
+                self.retries += 1
+            get_telemetry().count("retries")
+            time.sleep(self.backoff(attempt, retry_after))
+            attempt += 1
+
+    def stats(self):
+        with self._cond:
+            return {
+                "queue_depth": self.waiting,
+                "in_flight": self.in_flight,
+                "concurrency_limit": self.limit,
+                "max_concurrency": self.max_concurrency,
+                "throttled": self.throttled,
+                "retries": self.retries,
+            }
@@ -0,0 +1,15 @@
+import streamlit as st
+
+
+# Function to display one file's ledger balance and deposit figures
+def render_statement(statement, shared):
+    summary = statement["summary"]
+
+    # Display results for each file
+    with st.expander(f"📄 Processed Data from {statement['name']}"):
+        st.write(f"**Total Deposit Amount:** ${summary['Total Deposit Amount']}")
+        st.write(f"**Number of Deposits:** {summary['Number of Deposits']}")
+        st.write(f"**Total Daily Ledger Balance:** ${summary['Total Daily Ledger Balance']:.2f}")
+        st.write(f"**Average Daily Ledger Balance:** ${summary['Average Daily Ledger Balance']:.2f}")
+        st.write(f"**Negative Balance Days:** {summary['Negative Balance Days']}")
+        st.write(f"**Average Negative Days:** {summary['Average Negative Days (%)']:.2f}%")
@@ -0,0 +1,78 @@
+import streamlit as st
+import pandas as pd
+from views.common import paged_dataframe, raw_data
+
+# Custom CSS for styling
+CSS = """
+    <style>
+    .stProgress > div > div > div > div {
+        background-color: #4CAF50;
+    }
+    .metric-box {
+        padding: 10px; 
+        border-radius: 10px; 
+        text-align: center; 
+        background-color: #f3f3f3; 
+        box-shadow: 2px 2px 10px rgba(0,0,0,0.1);
+        margin-bottom: 10px;
+    }
+    .metric-title {
+        font-size: 18px;
+        margin-bottom: 5px;
+    }
+    .metric-value {
+        font-size: 24px;
+        color: #4CAF50;
+    }
+    </style>
+"""
+
+
+# Function to display metric cards
+def metric_card(title, value, icon):
+    st.markdown(f"""
+    <div class="metric-box">
+        <h4 class="metric-title">{icon} {title}</h4>
+        <h2 class="metric-value">{value}</h2>
+    </div>
+    """, unsafe_allow_html=True)
+
+
+# Function to display one statement's metric cards and, on request, its raw table
+def render_statement(statement, shared):
+    if not shared.get("css"):
+        st.markdown(CSS, unsafe_allow_html=True)
+        shared["css"] = True
+
+    file_name = statement["name"]
+    file_data = {**statement["fields"], **statement["summary"]}
+
+    st.markdown(f"## 🔹 {file_name}")
+
+    tab1, tab2 = st.tabs(["📊 Summary", "📜 Raw Extracted Data"])
+
+    with tab1:
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            metric_card("Avg. Daily Balance", f"${file_data.get('Average Daily Balance', 'N/A')}", "💰")
+        with col2:
+            metric_card("Total Negative Days", file_data.get('Total Negative Days', 'N/A'), "📉")
+        with col3:
+            avg_negative_days = file_data.get('Average Negative Days (%)', 'N/A')
+            metric_card("Avg. Negative Days", avg_negative_days if avg_negative_days == "N/A" else f"{avg_negative_days}%", "📊")
+
+        st.divider()
+        col1, col2 = st.columns(2)
+        with col1:
+            if "No.Of.Depositsandadditions" in file_data:
+                metric_card("No. of Deposits and Additions", file_data.get("No.Of.Depositsandadditions", "N/A"), "📥")
+        with col2:
+            if "Totalamountofdeposits" in file_data:
+                metric_card("Total Amount of Deposits", file_data.get("Totalamountofdeposits", "N/A"), "💵")
+
+    with tab2:
+        data = raw_data(statement)
+        if data is not None:
+            paged_dataframe(data.get("Daily Ending Balance", pd.DataFrame()), key=f"page-{statement['id']}")
+
+    st.divider()
@@ -0,0 +1,35 @@
+import math
+import streamlit as st
+from fields import display_frame
+
+# Rows shown per page of a raw table
+PAGE_SIZE = 100
+
+
+# Function to show a DataFrame one page at a time
+def paged_dataframe(df, key, page_size=PAGE_SIZE):
+    pages = max(1, math.ceil(len(df) / page_size))
+    page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, key=key) if pages > 1 else 1
+    st.dataframe(display_frame(df.iloc[(page - 1) * page_size:page * page_size]), use_container_width=True)
+
+
+# Function to fetch a statement's raw fields and tables only when the user asks
+def raw_data(statement, label="📜 Load raw extracted data"):
+    """Return the statement's extracted data once its toggle is on, else None.
+
+    Tables are not kept after a statement's summary is drawn; `load`
+    re-extracts them, normally straight from the result cache.
+    """
+    if not st.toggle(label, key=f"raw-{statement['id']}"):
+        return None
+    if "data" in statement:
+        return statement["data"]
+
+    try:
+        data = statement["load"]()
+    except Exception as e:
+        st.error(f"Could not load the raw data for {statement['name']}: {e}")
+        return None
+    if data is None:
+        st.warning(f"No raw data available for {statement['name']}")
+    return data
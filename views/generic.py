@@ -0,0 +1,16 @@
+import streamlit as st
+import pandas as pd
+from views.common import paged_dataframe, raw_data
+
+
+# Function to display one statement's fields, metrics and, on request, its tables
+def render_statement(statement, shared):
+    st.subheader(f"🔹 {statement['name']}")
+    for field_name, data in {**statement["fields"], **statement["summary"]}.items():
+        st.markdown(f"**{field_name}:** {data}")
+
+    data = raw_data(statement, f"📜 Show tables for {statement['name']}")
+    for field_name, table in (data or {}).items():
+        if isinstance(table, pd.DataFrame):
+            st.subheader(f"📌 {field_name}")
+            paged_dataframe(table, key=f"page-{statement['id']}-{field_name}")
@@ -0,0 +1,65 @@
+import streamlit as st
+import pandas as pd
+from profiles import wells_fargo as profile
+from views.common import paged_dataframe, raw_data
+
+
+# Function to display one file's balance summary, deposit details and raw tables
+def render_statement(statement, shared):
+    balance_aggregates = shared.setdefault("balance_aggregates", [])
+    file_name = statement["name"]
+    summary = statement["summary"]
+
+    # Per-table deposit figures are kept on the statement once its tables are released
+    if "deposits" not in statement:
+        statement["deposits"] = profile.deposit_data(statement["data"])
+    deposit_counts, total_deposits = statement["deposits"]
+
+    # Store balance summaries
+    has_balances = summary["Total Count"] != "N/A"
+    if has_balances:
+        balance_aggregates.append({
+            "File Name": file_name,
+            "Total Balance ": summary["Total Balance"],
+            "Average Balance ": summary["Average Balance"]
+        })
+
+    with st.expander(f"📊 Balance Summary for {file_name}"):
+        if balance_aggregates:
+
+            df_balances = pd.DataFrame(balance_aggregates)
+            st.table(df_balances)
+
+        if has_balances:
+            st.write(f"**Negative Days Count:** {summary['Negative Days Count']}")
+            st.write(f"**Average Negative Days (%):** {summary['Average Negative Days (%)']}%")
+        else:
+            st.write("No valid ending balance data found.")
+
+    # Display deposit details
+    with st.expander(f"💰 Deposit Details for {file_name}"):
+        st.write("### Deposits Identified:")
+        total_deposits_count = sum(deposit_counts.values())
+        total_deposits_amount = sum(total_deposits.values())
+
+        for page, count in deposit_counts.items():
+            st.write(f"**{page}:** {count} deposit(s) - ${total_deposits[page]:,.2f}")
+
+        st.write(f"### 🏦 **No.of.Deposits:** {total_deposits_count}")
+        st.write(f"### 🏦 **Total Amount of Deposits:** ${total_deposits_amount:,.2f}")
+
+    with st.expander(f"📄 Extracted Data from {file_name}"):
+        for field_name, data in statement["fields"].items():
+            st.markdown(f"**{field_name}:** {data}")
+
+        data = raw_data(statement, f"📜 Show tables for {file_name}")
+        if data is not None:
+            history = profile.transaction_history(data)
+            if not history.empty:
+                st.subheader("📌 Transaction History (all pages)")
+                paged_dataframe(history, key=f"page-{statement['id']}-history")
+
+            for field_name, table in data.items():
+                if isinstance(table, pd.DataFrame):
+                    st.subheader(f"📌 {field_name}")
+                    paged_dataframe(table, key=f"page-{statement['id']}-{field_name}")